@@ -1,12 +1,60 @@
-from django.contrib import admin
-from django.utils.html import format_html
+from functools import lru_cache
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.utils.html import escape, format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from django.db.models import Count, Avg
+from django.db.models import Case, Count, F, TextField, Value, When
+from django.db.models.functions import Concat, Length, Substr
+from django.db.models.lookups import GreaterThan
+from django.forms.models import BaseInlineFormSet
 from .models import (
     Challenge, Submission, ChallengeRating,
-    ChallengeFavorite, ChallengeDiscussion
+    ChallengeFavorite, ChallengeDiscussion, ChallengeTestCase
 )
+from .pagination import EstimatedCountPaginator
+from .tasks import evaluate_submissions_task, get_submission_evaluator
+
+REEVALUATE_CHUNK_SIZE = 500
+
+
+@lru_cache(maxsize=None)
+def _admin_change_url(app_model):
+    """Resolve an admin change URL once and return it as a format template.
+    
+    Only integer primary keys are substituted, so the result is safe to
+    interpolate into link markup without escaping.
+    """
+    return reverse(f'admin:{app_model}_change', args=[0]).replace('/0/', '/{}/')
+
+
+def _selected(queryset):
+    """Return the rows selected by an admin action.
+    
+    The selection is passed as a pk subquery so "select all" across pages
+    stays a short statement instead of a large literal IN list.
+    """
+    return queryset.model._default_manager.filter(
+        pk__in=queryset.values('pk')
+    )
+
+
+def _update_selected(queryset, **fields):
+    """Update the rows selected by an admin action."""
+    return _selected(queryset).update(**fields)
+
+
+class RecentRowsInlineFormSet(BaseInlineFormSet):
+    """Inline formset that only renders the most recent related rows."""
+    
+    max_rows = 25
+    
+    def get_queryset(self):
+        # Slice here rather than in the inline's get_queryset, since the
+        # formset still needs to filter the queryset by the parent object.
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset()[:self.max_rows]
+        return self._queryset
 
 
 class SubmissionInline(admin.TabularInline):
@@ -16,33 +64,29 @@ class SubmissionInline(admin.TabularInline):
     readonly_fields = ['user', 'submitted_at', 'status', 'score']
     fields = ['user', 'language', 'status', 'score', 'submitted_at']
     can_delete = False
+    formset = RecentRowsInlineFormSet
+    ordering = ['-submitted_at']
+    show_change_link = True
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
     
     def has_add_permission(self, request, obj=None):
         return False
 
 
-class ChallengeRatingInline(admin.TabularInline):
-    """Inline for ratings in challenge admin."""
-    model = ChallengeRating
+class ChallengeTestCaseInline(admin.TabularInline):
+    """Inline for test cases in challenge admin."""
+    model = ChallengeTestCase
     extra = 0
-    readonly_fields = ['user', 'rating', 'created_at']
-    fields = ['user', 'rating', 'difficulty_rating', 'clarity_rating', 'created_at']
-    can_delete = False
-    
-    def has_add_permission(self, request, obj=None):
-        return False
+    fields = ['ordinal', 'is_hidden', 'input', 'expected_output']
 
 
-class ChallengeDiscussionInline(admin.TabularInline):
-    """Inline for discussions in challenge admin."""
-    model = ChallengeDiscussion
-    extra = 0
-    readonly_fields = ['user', 'created_at', 'is_approved']
-    fields = ['user', 'content', 'is_approved', 'created_at']
-    can_delete = False
+class ChallengeChangeList(ChangeList):
+    """Changelist that leaves the long challenge content columns unloaded."""
     
-    def has_add_permission(self, request, obj=None):
-        return False
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer_content()
 
 
 @admin.register(Challenge)
@@ -67,7 +111,7 @@ class ChallengeAdmin(admin.ModelAdmin):
     
     readonly_fields = [
         'created_at', 'updated_at', 'submission_count',
-        'average_rating'
+        'average_rating', 'ratings_link', 'discussions_link'
     ]
     
     fieldsets = (
@@ -86,7 +130,7 @@ class ChallengeAdmin(admin.ModelAdmin):
         }),
         ('Evaluation', {
             'fields': (
-                'time_limit', 'memory_limit', 'test_cases',
+                'time_limit', 'memory_limit',
                 'solution_template', 'starter_code'
             )
         }),
@@ -98,55 +142,74 @@ class ChallengeAdmin(admin.ModelAdmin):
         ('Statistics', {
             'fields': (
                 'submission_count', 'average_rating',
+                'ratings_link', 'discussions_link',
                 'created_at', 'updated_at'
             ),
             'classes': ('collapse',)
         })
     )
     
-    filter_horizontal = ['tags']
+    autocomplete_fields = ['author', 'category', 'tags']
     
-    inlines = [SubmissionInline, ChallengeRatingInline, ChallengeDiscussionInline]
+    inlines = [ChallengeTestCaseInline, SubmissionInline]
     
     actions = ['publish_challenges', 'unpublish_challenges', 'feature_challenges', 'unfeature_challenges']
     
     def get_queryset(self, request):
-        """Optimize queryset with annotations."""
-        queryset = super().get_queryset(request)
-        return queryset.select_related(
+        """Optimize queryset."""
+        return super().get_queryset(request).select_related(
             'author', 'category'
         ).prefetch_related(
             'tags'
-        ).annotate(
-            submission_count_annotated=Count('submissions'),
-            average_rating_annotated=Avg('ratings__rating')
         )
     
+    def get_changelist(self, request, **kwargs):
+        """Use a changelist that defers the challenge content columns."""
+        return ChallengeChangeList
+    
     def submission_count(self, obj):
         """Display submission count."""
-        count = getattr(obj, 'submission_count_annotated', obj.submission_count)
+        count = obj.submission_count
         if count > 0:
             url = reverse('admin:challenges_submission_changelist')
             return format_html(
                 '<a href="{}?challenge__id__exact={}">{}</a>',
-                url, obj.id, count
+                url, obj.pk, count
             )
         return count
     submission_count.short_description = 'Submissions'
-    submission_count.admin_order_field = 'submission_count_annotated'
+    submission_count.admin_order_field = 'submission_count'
     
     def average_rating(self, obj):
         """Display average rating."""
-        rating = getattr(obj, 'average_rating_annotated', obj.average_rating)
+        rating = obj.average_rating
         if rating:
             return f"{rating:.1f} ⭐"
         return "No ratings"
     average_rating.short_description = 'Avg Rating'
-    average_rating.admin_order_field = 'average_rating_annotated'
+    average_rating.admin_order_field = 'average_rating'
+    
+    def ratings_link(self, obj):
+        """Link to the ratings for this challenge."""
+        url = reverse('admin:challenges_challengerating_changelist')
+        return format_html(
+            '<a href="{}?challenge__id__exact={}">View ratings</a>',
+            url, obj.pk
+        )
+    ratings_link.short_description = 'Ratings'
+    
+    def discussions_link(self, obj):
+        """Link to the discussions for this challenge."""
+        url = reverse('admin:challenges_challengediscussion_changelist')
+        return format_html(
+            '<a href="{}?challenge__id__exact={}">View discussions</a>',
+            url, obj.pk
+        )
+    discussions_link.short_description = 'Discussions'
     
     def publish_challenges(self, request, queryset):
         """Publish selected challenges."""
-        updated = queryset.update(status=Challenge.Status.PUBLISHED)
+        updated = _selected(queryset).update_status(Challenge.Status.PUBLISHED)
         self.message_user(
             request,
             f"{updated} challenge(s) published successfully."
@@ -155,7 +218,7 @@ class ChallengeAdmin(admin.ModelAdmin):
     
     def unpublish_challenges(self, request, queryset):
         """Unpublish selected challenges."""
-        updated = queryset.update(status=Challenge.Status.DRAFT)
+        updated = _selected(queryset).update_status(Challenge.Status.DRAFT)
         self.message_user(
             request,
             f"{updated} challenge(s) unpublished successfully."
@@ -164,7 +227,7 @@ class ChallengeAdmin(admin.ModelAdmin):
     
     def feature_challenges(self, request, queryset):
         """Feature selected challenges."""
-        updated = queryset.update(is_featured=True)
+        updated = _selected(queryset).update_content(is_featured=True)
         self.message_user(
             request,
             f"{updated} challenge(s) featured successfully."
@@ -173,7 +236,7 @@ class ChallengeAdmin(admin.ModelAdmin):
     
     def unfeature_challenges(self, request, queryset):
         """Unfeature selected challenges."""
-        updated = queryset.update(is_featured=False)
+        updated = _selected(queryset).update_content(is_featured=False)
         self.message_user(
             request,
             f"{updated} challenge(s) unfeatured successfully."
@@ -229,35 +292,58 @@ class SubmissionAdmin(admin.ModelAdmin):
         })
     )
     
+    list_select_related = ['user', 'challenge']
+    
+    autocomplete_fields = ['challenge', 'user']
+    
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
     actions = ['reevaluate_submissions']
     
-    def get_queryset(self, request):
-        """Optimize queryset."""
-        return super().get_queryset(request).select_related(
-            'user', 'challenge'
-        )
+    def save_model(self, request, obj, form, change):
+        """Recompute the rewards, which save() no longer does, then save."""
+        obj.finalize(obj.challenge)
+        super().save_model(request, obj, form, change)
     
     def challenge_link(self, obj):
         """Link to challenge admin."""
-        url = reverse('admin:challenges_challenge_change', args=[obj.challenge.id])
-        return format_html('<a href="{}">{}</a>', url, obj.challenge.title)
+        url = _admin_change_url('challenges_challenge').format(obj.challenge_id)
+        return mark_safe(f'<a href="{url}">{escape(obj.challenge.title)}</a>')
     challenge_link.short_description = 'Challenge'
     challenge_link.admin_order_field = 'challenge__title'
     
     def user_link(self, obj):
         """Link to user admin."""
-        url = reverse('admin:users_user_change', args=[obj.user.id])
-        return format_html('<a href="{}">{}</a>', url, obj.user.username)
+        url = _admin_change_url('users_user').format(obj.user_id)
+        return mark_safe(f'<a href="{url}">{escape(obj.user.username)}</a>')
     user_link.short_description = 'User'
     user_link.admin_order_field = 'user__username'
     
     def reevaluate_submissions(self, request, queryset):
         """Reevaluate selected submissions."""
-        updated = queryset.update(
-            status=Submission.Status.PENDING,
-            evaluated_at=None
-        )
-        # TODO: Queue submissions for reevaluation
+        if get_submission_evaluator() is None:
+            # Resetting would only strand the submissions in pending
+            self.message_user(
+                request,
+                "No submission evaluator is configured, so no submissions "
+                "were changed.",
+                level=messages.WARNING
+            )
+            return
+        
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = 0
+        
+        # Reset and queue in bounded chunks so each UPDATE stays short
+        for start in range(0, len(pks), REEVALUATE_CHUNK_SIZE):
+            chunk = pks[start:start + REEVALUATE_CHUNK_SIZE]
+            updated += Submission.objects.filter(pk__in=chunk).update(
+                status=Submission.Status.PENDING,
+                evaluated_at=None
+            )
+            evaluate_submissions_task.delay(chunk)
+        
         self.message_user(
             request,
             f"{updated} submission(s) queued for reevaluation."
@@ -285,6 +371,10 @@ class ChallengeRatingAdmin(admin.ModelAdmin):
     
     readonly_fields = ['created_at', 'updated_at']
     
+    list_select_related = ['user', 'challenge']
+    
+    autocomplete_fields = ['challenge', 'user']
+    
     fieldsets = (
         ('Rating Info', {
             'fields': (
@@ -302,23 +392,17 @@ class ChallengeRatingAdmin(admin.ModelAdmin):
         })
     )
     
-    def get_queryset(self, request):
-        """Optimize queryset."""
-        return super().get_queryset(request).select_related(
-            'user', 'challenge'
-        )
-    
     def challenge_link(self, obj):
         """Link to challenge admin."""
-        url = reverse('admin:challenges_challenge_change', args=[obj.challenge.id])
-        return format_html('<a href="{}">{}</a>', url, obj.challenge.title)
+        url = _admin_change_url('challenges_challenge').format(obj.challenge_id)
+        return mark_safe(f'<a href="{url}">{escape(obj.challenge.title)}</a>')
     challenge_link.short_description = 'Challenge'
     challenge_link.admin_order_field = 'challenge__title'
     
     def user_link(self, obj):
         """Link to user admin."""
-        url = reverse('admin:users_user_change', args=[obj.user.id])
-        return format_html('<a href="{}">{}</a>', url, obj.user.username)
+        url = _admin_change_url('users_user').format(obj.user_id)
+        return mark_safe(f'<a href="{url}">{escape(obj.user.username)}</a>')
     user_link.short_description = 'User'
     user_link.admin_order_field = 'user__username'
 
@@ -342,23 +426,21 @@ class ChallengeFavoriteAdmin(admin.ModelAdmin):
     
     readonly_fields = ['created_at']
     
-    def get_queryset(self, request):
-        """Optimize queryset."""
-        return super().get_queryset(request).select_related(
-            'user', 'challenge'
-        )
+    list_select_related = ['user', 'challenge']
+    
+    autocomplete_fields = ['challenge', 'user']
     
     def challenge_link(self, obj):
         """Link to challenge admin."""
-        url = reverse('admin:challenges_challenge_change', args=[obj.challenge.id])
-        return format_html('<a href="{}">{}</a>', url, obj.challenge.title)
+        url = _admin_change_url('challenges_challenge').format(obj.challenge_id)
+        return mark_safe(f'<a href="{url}">{escape(obj.challenge.title)}</a>')
     challenge_link.short_description = 'Challenge'
     challenge_link.admin_order_field = 'challenge__title'
     
     def user_link(self, obj):
         """Link to user admin."""
-        url = reverse('admin:users_user_change', args=[obj.user.id])
-        return format_html('<a href="{}">{}</a>', url, obj.user.username)
+        url = _admin_change_url('users_user').format(obj.user_id)
+        return mark_safe(f'<a href="{url}">{escape(obj.user.username)}</a>')
     user_link.short_description = 'User'
     user_link.admin_order_field = 'user__username'
 
@@ -372,6 +454,17 @@ class ChallengeDiscussionReplyInline(admin.TabularInline):
     fields = ['user', 'content', 'is_approved', 'created_at']
     can_delete = False
     
+    def get_queryset(self, request):
+        # Only load the columns the inline form and row labels render, plus
+        # updated_at so saving a deferred row still bumps the auto_now field.
+        return super().get_queryset(request).select_related(
+            'user', 'challenge'
+        ).only(
+            'id', 'parent_id', 'content', 'is_approved', 'created_at',
+            'updated_at', 'user__email', 'user__first_name', 'user__last_name',
+            'challenge__title'
+        )
+    
     def has_add_permission(self, request, obj=None):
         return False
 
@@ -421,35 +514,55 @@ class ChallengeDiscussionAdmin(admin.ModelAdmin):
         })
     )
     
+    list_select_related = ['user', 'challenge', 'parent']
+    
+    autocomplete_fields = ['challenge', 'user', 'parent']
+    
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
     actions = ['approve_discussions', 'disapprove_discussions']
     
     inlines = [ChallengeDiscussionReplyInline]
     
     def get_queryset(self, request):
-        """Optimize queryset."""
+        """Annotate reply counts and a truncated content preview.
+        
+        The user and challenge are joined here rather than only through
+        list_select_related, since the parent autocomplete also renders
+        each result with __str__.
+        """
         return super().get_queryset(request).select_related(
-            'user', 'challenge', 'parent'
+            'user', 'challenge'
         ).annotate(
-            reply_count_annotated=Count('replies')
-        )
+            reply_count_annotated=Count('replies'),
+            content_preview_sql=Case(
+                When(
+                    GreaterThan(Length('content'), 50),
+                    then=Concat(Substr('content', 1, 50), Value('...'))
+                ),
+                default=F('content'),
+                output_field=TextField()
+            )
+        ).defer('content')
     
     def challenge_link(self, obj):
         """Link to challenge admin."""
-        url = reverse('admin:challenges_challenge_change', args=[obj.challenge.id])
-        return format_html('<a href="{}">{}</a>', url, obj.challenge.title)
+        url = _admin_change_url('challenges_challenge').format(obj.challenge_id)
+        return mark_safe(f'<a href="{url}">{escape(obj.challenge.title)}</a>')
     challenge_link.short_description = 'Challenge'
     challenge_link.admin_order_field = 'challenge__title'
     
     def user_link(self, obj):
         """Link to user admin."""
-        url = reverse('admin:users_user_change', args=[obj.user.id])
-        return format_html('<a href="{}">{}</a>', url, obj.user.username)
+        url = _admin_change_url('users_user').format(obj.user_id)
+        return mark_safe(f'<a href="{url}">{escape(obj.user.username)}</a>')
     user_link.short_description = 'User'
     user_link.admin_order_field = 'user__username'
     
     def content_preview(self, obj):
         """Display a preview of the discussion content."""
-        return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
+        return obj.content_preview_sql
     content_preview.short_description = 'Content'
     
     def reply_count(self, obj):
@@ -459,7 +572,7 @@ class ChallengeDiscussionAdmin(admin.ModelAdmin):
             url = reverse('admin:challenges_challengediscussion_changelist')
             return format_html(
                 '<a href="{}?parent__id__exact={}">{}</a>',
-                url, obj.id, count
+                url, obj.pk, count
             )
         return count
     reply_count.short_description = 'Replies'
@@ -467,7 +580,7 @@ class ChallengeDiscussionAdmin(admin.ModelAdmin):
     
     def approve_discussions(self, request, queryset):
         """Approve selected discussions."""
-        updated = queryset.update(is_approved=True)
+        updated = _update_selected(queryset, is_approved=True)
         self.message_user(
             request,
             f"{updated} discussion(s) approved successfully."
@@ -476,7 +589,7 @@ class ChallengeDiscussionAdmin(admin.ModelAdmin):
     
     def disapprove_discussions(self, request, queryset):
         """Disapprove selected discussions."""
-        updated = queryset.update(is_approved=False)
+        updated = _update_selected(queryset, is_approved=False)
         self.message_user(
             request,
             f"{updated} discussion(s) disapproved successfully."
@@ -1,3 +1,5 @@
+import os
+
 from django.apps import AppConfig
 
 
@@ -10,4 +12,7 @@ class ChallengesConfig(AppConfig):
     
     def ready(self):
         """Import signals when the app is ready."""
-        import apps.challenges.signals
\ No newline at end of file
+        # Set DJANGO_SKIP_SIGNALS for migration-only or maintenance runs
+        # that should not wire up the statistics receivers.
+        if not os.environ.get('DJANGO_SKIP_SIGNALS'):
+            import apps.challenges.signals
\ No newline at end of file
@@ -0,0 +1,53 @@
+import factory
+from factory.django import DjangoModelFactory
+from django.contrib.auth import get_user_model
+from apps.content.models import Category
+from .models import Challenge, Submission
+
+User = get_user_model()
+
+
+class UserFactory(DjangoModelFactory):
+    """Factory for users that never log in with a password."""
+    
+    class Meta:
+        model = User
+    
+    email = factory.Sequence(lambda n: f'user{n}@example.com')
+    first_name = 'Test'
+    last_name = 'User'
+
+
+class CategoryFactory(DjangoModelFactory):
+    """Factory for content categories."""
+    
+    class Meta:
+        model = Category
+    
+    name = factory.Sequence(lambda n: f'Category {n}')
+
+
+class ChallengeFactory(DjangoModelFactory):
+    """Factory for published challenges."""
+    
+    class Meta:
+        model = Challenge
+    
+    title = factory.Sequence(lambda n: f'Problem {n}')
+    description = 'Practice problem'
+    problem_statement = '...'
+    author = factory.SubFactory(UserFactory)
+    category = factory.SubFactory(CategoryFactory)
+    status = Challenge.Status.PUBLISHED
+
+
+class SubmissionFactory(DjangoModelFactory):
+    """Factory for pending Python submissions."""
+    
+    class Meta:
+        model = Submission
+    
+    challenge = factory.SubFactory(ChallengeFactory)
+    user = factory.SubFactory(UserFactory)
+    code = 'def solution(): pass'
+    language = Submission.Language.PYTHON
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-16 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['status', '-created_at'], name='challenges__status_c48f5f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['is_featured', '-published_at'], name='challenges__is_feat_d9ef70_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['category', 'difficulty_level'], name='challenges__categor_669fe4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['challenge', '-submitted_at'], name='challenges__challen_750fff_idx'),
+        ),
+    ]
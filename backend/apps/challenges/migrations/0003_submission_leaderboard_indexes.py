@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-16 19:46
+
+from django.db import migrations, models
+
+import apps.challenges.operations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('challenges', '0002_admin_list_indexes'),
+    ]
+
+    operations = [
+        apps.challenges.operations.AddIndexConcurrently(
+            model_name='submission',
+            index=models.Index(fields=['challenge', 'user', '-submitted_at'], name='challenges__challen_94732b_idx'),
+        ),
+        apps.challenges.operations.AddIndexConcurrently(
+            model_name='submission',
+            index=models.Index(fields=['challenge', 'status', '-score', 'execution_time'], name='sub_chal_stat_score_i'),
+        ),
+        apps.challenges.operations.RemoveIndexConcurrently(
+            model_name='submission',
+            name='challenges__challen_6e1ed1_idx',
+        ),
+    ]
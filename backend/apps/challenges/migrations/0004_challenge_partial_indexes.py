@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 19:48
+
+from django.db import migrations, models
+
+import apps.challenges.operations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('challenges', '0003_submission_leaderboard_indexes'),
+    ]
+
+    operations = [
+        apps.challenges.operations.AddIndexConcurrently(
+            model_name='challenge',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-published_at'], name='chal_published_idx'),
+        ),
+        apps.challenges.operations.AddIndexConcurrently(
+            model_name='challenge',
+            index=models.Index(condition=models.Q(('is_featured', True), ('status', 'published')), fields=['-published_at'], name='chal_featured_idx'),
+        ),
+        apps.challenges.operations.RemoveIndexConcurrently(
+            model_name='challenge',
+            name='challenges__status_fcde08_idx',
+        ),
+        apps.challenges.operations.RemoveIndexConcurrently(
+            model_name='challenge',
+            name='challenges__is_feat_c0ac87_idx',
+        ),
+    ]
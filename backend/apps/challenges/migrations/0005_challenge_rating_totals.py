@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-16 19:50
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rating_totals(apps, schema_editor):
+    Challenge = apps.get_model('challenges', 'Challenge')
+    ChallengeRating = apps.get_model('challenges', 'ChallengeRating')
+    
+    totals = ChallengeRating.objects.values('challenge_id').annotate(
+        total=Sum('rating'), count=Count('id')
+    ).order_by()
+    for row in totals:
+        Challenge.objects.filter(pk=row['challenge_id']).update(
+            rating_sum=row['total'], rating_count=row['count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0004_challenge_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,161 @@
+# Generated by Django 4.2.7 on 2026-10-16 19:55
+
+import json
+import logging
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+logger = logging.getLogger(__name__)
+
+
+def as_text(value):
+    """Keep strings as they are and store anything else as JSON."""
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def copy_test_cases_to_rows(apps, schema_editor):
+    Challenge = apps.get_model('challenges', 'Challenge')
+    ChallengeTestCase = apps.get_model('challenges', 'ChallengeTestCase')
+    Submission = apps.get_model('challenges', 'Submission')
+    SubmissionTestResult = apps.get_model('challenges', 'SubmissionTestResult')
+    
+    rows = []
+    # Legacy results are matched to cases by their original list position
+    positions = {}
+    challenges = Challenge.objects.values_list('id', 'test_cases', 'hidden_test_cases')
+    for challenge_id, visible, hidden in challenges.iterator():
+        cases = [(case, False) for case in visible or []]
+        cases += [(case, True) for case in hidden or []]
+        for position, (case, is_hidden) in enumerate(cases):
+            if not isinstance(case, dict) or 'expected_output' not in case:
+                logger.warning(
+                    'Skipping malformed test case %d of challenge %s: %r',
+                    position, challenge_id, case
+                )
+                continue
+            ordinal = len(positions.setdefault(challenge_id, {}))
+            positions[challenge_id][position] = ordinal
+            rows.append(ChallengeTestCase(
+                challenge_id=challenge_id,
+                ordinal=ordinal,
+                is_hidden=is_hidden,
+                input=as_text(case.get('input', '')),
+                expected_output=as_text(case['expected_output'])
+            ))
+    ChallengeTestCase.objects.bulk_create(rows, batch_size=1000)
+    
+    case_ids = {}
+    for case in ChallengeTestCase.objects.values('id', 'challenge_id', 'ordinal'):
+        case_ids[(case['challenge_id'], case['ordinal'])] = case['id']
+    
+    results = []
+    submissions = Submission.objects.exclude(test_results=[]).values_list(
+        'id', 'challenge_id', 'test_results'
+    )
+    for submission_id, challenge_id, test_results in submissions.iterator():
+        for position, result in enumerate(test_results or []):
+            ordinal = positions.get(challenge_id, {}).get(position)
+            case_id = case_ids.get((challenge_id, ordinal))
+            if case_id is None or not isinstance(result, dict):
+                continue
+            results.append(SubmissionTestResult(
+                submission_id=submission_id,
+                test_case_id=case_id,
+                passed=bool(result.get('passed', result.get('status') == 'passed')),
+                runtime_ms=result.get('execution_time'),
+                memory_kb=result.get('memory_used')
+            ))
+    SubmissionTestResult.objects.bulk_create(results, batch_size=1000)
+
+
+def copy_test_cases_to_json(apps, schema_editor):
+    Challenge = apps.get_model('challenges', 'Challenge')
+    ChallengeTestCase = apps.get_model('challenges', 'ChallengeTestCase')
+    Submission = apps.get_model('challenges', 'Submission')
+    SubmissionTestResult = apps.get_model('challenges', 'SubmissionTestResult')
+    
+    cases = {}
+    for case in ChallengeTestCase.objects.order_by('challenge_id', 'ordinal').iterator():
+        visible, hidden = cases.setdefault(case.challenge_id, ([], []))
+        (hidden if case.is_hidden else visible).append({
+            'input': case.input,
+            'expected_output': case.expected_output
+        })
+    for challenge_id, (visible, hidden) in cases.items():
+        Challenge.objects.filter(pk=challenge_id).update(
+            test_cases=visible, hidden_test_cases=hidden
+        )
+    
+    results = {}
+    for result in SubmissionTestResult.objects.order_by(
+        'submission_id', 'test_case__ordinal'
+    ).iterator():
+        results.setdefault(result.submission_id, []).append({
+            'passed': result.passed,
+            'execution_time': result.runtime_ms,
+            'memory_used': result.memory_kb
+        })
+    for submission_id, test_results in results.items():
+        Submission.objects.filter(pk=submission_id).update(test_results=test_results)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0005_challenge_rating_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChallengeTestCase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ordinal', models.PositiveIntegerField(default=0)),
+                ('is_hidden', models.BooleanField(default=False, help_text='Hidden test cases are only used for evaluation')),
+                ('input', models.TextField(blank=True)),
+                ('expected_output', models.TextField()),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_cases', to='challenges.challenge')),
+            ],
+            options={
+                'ordering': ['ordinal'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SubmissionTestResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('passed', models.BooleanField(default=False)),
+                ('runtime_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('memory_kb', models.PositiveIntegerField(blank=True, null=True)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_results', to='challenges.submission')),
+                ('test_case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='challenges.challengetestcase')),
+            ],
+            options={
+                'ordering': ['id'],
+                'unique_together': {('submission', 'test_case')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='challengetestcase',
+            index=models.Index(fields=['challenge', 'is_hidden', 'ordinal'], name='challenges__challen_cd4b7d_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='challengetestcase',
+            unique_together={('challenge', 'ordinal')},
+        ),
+        migrations.RunPython(copy_test_cases_to_rows, copy_test_cases_to_json),
+        migrations.RemoveField(
+            model_name='challenge',
+            name='hidden_test_cases',
+        ),
+        migrations.RemoveField(
+            model_name='challenge',
+            name='test_cases',
+        ),
+        migrations.RemoveField(
+            model_name='submission',
+            name='test_results',
+        ),
+    ]
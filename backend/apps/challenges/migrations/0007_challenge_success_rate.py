@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:00
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, DecimalField
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+
+def backfill_success_rate(apps, schema_editor):
+    Challenge = apps.get_model('challenges', 'Challenge')
+    decimal = DecimalField(max_digits=4, decimal_places=1)
+    
+    Challenge.objects.filter(submission_count__gt=0).update(
+        success_rate=Coalesce(
+            Cast(
+                Round(
+                    Cast(F('solved_count'), FloatField()) * 100
+                    / NullIf(F('submission_count'), 0),
+                    1
+                ),
+                decimal
+            ),
+            0,
+            output_field=decimal
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0006_normalize_test_cases'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='success_rate',
+            field=models.DecimalField(decimal_places=1, default=0, help_text='Percentage of submissions that were accepted', max_digits=4),
+        ),
+        migrations.RunPython(backfill_success_rate, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['success_rate'], name='challenges__success_e6ec32_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:08
+
+from django.db import migrations, models
+
+import apps.challenges.operations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('challenges', '0007_challenge_success_rate'),
+    ]
+
+    operations = [
+        apps.challenges.operations.AddIndexConcurrently(
+            model_name='submission',
+            index=models.Index(fields=['user', 'status', '-submitted_at'], include=('challenge', 'score'), name='sub_user_status_sub_i'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:11
+
+from django.db import migrations, models
+
+import apps.challenges.operations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('challenges', '0008_submission_user_status_index'),
+    ]
+
+    operations = [
+        apps.challenges.operations.AddIndexConcurrently(
+            model_name='challenge',
+            index=models.Index(django.db.models.functions.text.Lower('slug'), name='chal_slug_lower_i'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:18
+
+import apps.challenges.operations
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('challenges', '0009_challenge_slug_lower_index'),
+    ]
+
+    operations = [
+        apps.challenges.operations.AddIndexConcurrently(
+            model_name='submission',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['submitted_at'], name='sub_submitted_brin', pages_per_range=32),
+        ),
+    ]
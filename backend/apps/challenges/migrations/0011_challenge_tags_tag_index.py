@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def _concurrently(schema_editor):
+    """Build without locking writes on PostgreSQL, plainly elsewhere."""
+    return 'CONCURRENTLY ' if schema_editor.connection.vendor == 'postgresql' else ''
+
+
+def create_tag_index(apps, schema_editor):
+    schema_editor.execute(
+        f'CREATE INDEX {_concurrently(schema_editor)}IF NOT EXISTS '
+        'chal_tags_tag_chal_i ON challenges_challenge_tags (tag_id, challenge_id)'
+    )
+
+
+def drop_tag_index(apps, schema_editor):
+    schema_editor.execute(
+        f'DROP INDEX {_concurrently(schema_editor)}IF EXISTS chal_tags_tag_chal_i'
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('challenges', '0010_submission_submitted_brin'),
+    ]
+
+    operations = [
+        # The auto-created M2M table only has (challenge_id, tag_id) and
+        # single-column indexes; filtering challenges by tag needs tag first.
+        migrations.RunPython(create_tag_index, drop_tag_index),
+    ]
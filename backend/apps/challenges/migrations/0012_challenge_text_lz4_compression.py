@@ -0,0 +1,36 @@
+from django.db import DatabaseError, migrations, transaction
+
+COMPRESSED_COLUMNS = ['problem_statement', 'solution_code', 'constraints']
+
+
+def set_compression(method):
+    def apply(apps, schema_editor):
+        connection = schema_editor.connection
+        # Column compression needs PostgreSQL 14+ built with lz4 support
+        if connection.vendor != 'postgresql' or connection.pg_version < 140000:
+            return
+        
+        Challenge = apps.get_model('challenges', 'Challenge')
+        table = schema_editor.quote_name(Challenge._meta.db_table)
+        try:
+            with transaction.atomic(using=connection.alias):
+                for column in COMPRESSED_COLUMNS:
+                    schema_editor.execute(
+                        f'ALTER TABLE {table} ALTER COLUMN '
+                        f'{schema_editor.quote_name(column)} SET COMPRESSION {method}'
+                    )
+        except DatabaseError:
+            # Server built without lz4; keep the default pglz compression
+            pass
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0011_challenge_tags_tag_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_compression('lz4'), set_compression('default')),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('challenges', '0012_challenge_text_lz4_compression'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='challengefavorite',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='favorite_challenges', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='challengefavorite',
+            index=models.Index(fields=['user', '-created_at'], name='fav_user_created_i'),
+        ),
+    ]
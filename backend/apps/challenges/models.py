@@ -1,14 +1,101 @@
-from django.db import models
+import json
+from django.db import connections, models
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import BrinIndex
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from django.utils.text import slugify
+from django.db.models.functions import Cast, Coalesce, Lower, Now, NullIf, Round
 from cloudinary.models import CloudinaryField
 from apps.content.models import Category, Tag
 
 User = get_user_model()
 
 
+class ChallengeQuerySet(models.QuerySet):
+    """QuerySet with shortcuts for challenge listings."""
+    
+    def published(self):
+        """Return only published challenges."""
+        return self.filter(status=Challenge.Status.PUBLISHED)
+    
+    def update_content(self, **fields):
+        """Bulk-update fields and bump updated_at, as save() would.
+        
+        The cached detail payload is keyed on updated_at, so bulk writes to
+        any field outside its live fields must go through here.
+        """
+        return self.update(updated_at=Now(), **fields)
+    
+    def update_status(self, status):
+        """Bulk-update status, keeping published_at in step as save() does."""
+        if status == Challenge.Status.PUBLISHED:
+            published_at = Coalesce('published_at', Now())
+        else:
+            published_at = None
+        return self.update_content(status=status, published_at=published_at)
+    
+    def with_slug(self, slug):
+        """Filter by slug case-insensitively, using the lower(slug) index."""
+        return self.alias(slug_lower=Lower('slug')).filter(
+            slug_lower=slug.lower()
+        )
+    
+    def with_favorite_flag(self, user):
+        """Annotate is_favorited for the given user with a single EXISTS."""
+        return self.annotate(
+            is_favorited=models.Exists(
+                ChallengeFavorite.objects.filter(
+                    user=user, challenge=models.OuterRef('pk')
+                )
+            )
+        )
+    
+    def with_solved_flag(self, user):
+        """Annotate is_solved for the given user with a single EXISTS."""
+        return self.annotate(
+            is_solved=models.Exists(
+                Submission.objects.filter(
+                    user=user,
+                    challenge=models.OuterRef('pk'),
+                    status=Submission.Status.ACCEPTED
+                )
+            )
+        )
+    
+    def with_best_submission(self, user):
+        """Prefetch the user's best submission per challenge as a one-item list."""
+        return self.prefetch_related(
+            models.Prefetch(
+                'submissions',
+                queryset=Submission.objects.filter(user=user).only(
+                    'challenge', 'status', 'score', 'execution_time',
+                    'submitted_at'
+                ).order_by('-score', 'execution_time')[:1],
+                to_attr='user_best_submissions'
+            )
+        )
+    
+    def defer_content(self):
+        """Skip the large text and JSON columns that listings never render."""
+        return self.defer(
+            'problem_statement', 'input_format', 'output_format',
+            'constraints', 'examples', 'hints', 'solution_code',
+            'solution_explanation'
+        )
+    
+    def with_list_relations(self):
+        """Load the relations rendered by the challenge list serializer."""
+        return self.select_related('author__profile').prefetch_related(
+            models.Prefetch(
+                'category', queryset=Category.objects.with_published_counts()
+            ),
+            'tags'
+        )
+
+
 class Challenge(models.Model):
     """Model for environmental challenges."""
     
@@ -87,16 +174,6 @@ class Challenge(models.Model):
         help_text="List of hints for solving the challenge"
     )
     
-    # Test Cases
-    test_cases = models.JSONField(
-        default=list,
-        help_text="List of test cases with input/expected output"
-    )
-    hidden_test_cases = models.JSONField(
-        default=list,
-        help_text="Hidden test cases for evaluation"
-    )
-    
     # Solution
     solution_code = models.TextField(
         blank=True,
@@ -150,19 +227,42 @@ class Challenge(models.Model):
     # Statistics (cached fields)
     submission_count = models.PositiveIntegerField(default=0)
     solved_count = models.PositiveIntegerField(default=0)
+    success_rate = models.DecimalField(
+        max_digits=4,
+        decimal_places=1,
+        default=0,
+        help_text="Percentage of submissions that were accepted"
+    )
     average_rating = models.DecimalField(
         max_digits=3,
         decimal_places=2,
         null=True,
         blank=True
     )
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    
+    objects = ChallengeQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['difficulty_level', 'challenge_type']),
-            models.Index(fields=['status', 'published_at']),
-            models.Index(fields=['is_featured', 'status']),
+            models.Index(
+                fields=['-published_at'],
+                condition=models.Q(status='published'),
+                name='chal_published_idx'
+            ),
+            models.Index(
+                fields=['-published_at'],
+                condition=models.Q(is_featured=True, status='published'),
+                name='chal_featured_idx'
+            ),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['is_featured', '-published_at']),
+            models.Index(fields=['category', 'difficulty_level']),
+            models.Index(fields=['success_rate']),
+            models.Index(Lower('slug'), name='chal_slug_lower_i'),
         ]
     
     def __str__(self):
@@ -173,26 +273,179 @@ class Challenge(models.Model):
         """Check if challenge is published."""
         return self.status == self.Status.PUBLISHED
     
-    @property
-    def success_rate(self):
-        """Calculate success rate percentage."""
-        if self.submission_count == 0:
-            return 0
-        return round((self.solved_count / self.submission_count) * 100, 1)
+    @staticmethod
+    def success_rate_expression(solved_count, submission_count):
+        """Return a SQL expression for the success rate percentage."""
+        return Coalesce(
+            Cast(
+                Round(
+                    Cast(solved_count, models.FloatField()) * 100
+                    / NullIf(submission_count, 0),
+                    1
+                ),
+                models.DecimalField(max_digits=4, decimal_places=1)
+            ),
+            0,
+            output_field=models.DecimalField(max_digits=4, decimal_places=1)
+        )
+    
+    @classmethod
+    def update_submission_stats(cls, pk, **counts):
+        """Atomically update cached submission counters and the success rate.
+        
+        Counters not passed keep their current value; both sides of the
+        ratio are taken from the same UPDATE so the rate cannot drift.
+        """
+        return cls.objects.filter(pk=pk).update(
+            success_rate=cls.success_rate_expression(
+                counts.get('solved_count', models.F('solved_count')),
+                counts.get('submission_count', models.F('submission_count'))
+            ),
+            **counts
+        )
+    
+    @staticmethod
+    def submission_count_expressions():
+        """Return correlated (submission_count, solved_count) subqueries."""
+        submissions = Submission.objects.filter(
+            challenge=models.OuterRef('pk')
+        ).order_by().values('challenge')
+        counted = submissions.annotate(total=models.Count('id')).values('total')
+        return (
+            Coalesce(models.Subquery(counted), 0),
+            Coalesce(
+                models.Subquery(counted.filter(status=Submission.Status.ACCEPTED)),
+                0
+            )
+        )
+    
+    @classmethod
+    def refresh_submission_stats(cls, pk):
+        """Recount one challenge's submission statistics in a single UPDATE."""
+        submission_count, solved_count = cls.submission_count_expressions()
+        return cls.update_submission_stats(
+            pk, submission_count=submission_count, solved_count=solved_count
+        )
+    
+    @classmethod
+    def recompute_submission_stats(cls):
+        """Recount cached submission statistics for challenges that drifted.
+        
+        Runs as a single UPDATE that only touches rows whose stored counters
+        no longer match the submissions table. On PostgreSQL the counts come
+        from one grouped aggregate joined in with UPDATE ... FROM.
+        """
+        connection = connections[cls.objects.db]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE {cls._meta.db_table} AS c
+                    SET submission_count = s.total,
+                        solved_count = s.solved,
+                        success_rate = COALESCE(
+                            ROUND(s.solved * 100.0 / NULLIF(s.total, 0), 1), 0
+                        )
+                    FROM (
+                        SELECT ch.id, COUNT(sub.id) AS total,
+                               COUNT(sub.id) FILTER (
+                                   WHERE sub.status = %s
+                               ) AS solved
+                        FROM {cls._meta.db_table} AS ch
+                        LEFT JOIN {Submission._meta.db_table} AS sub
+                            ON sub.challenge_id = ch.id
+                        GROUP BY ch.id
+                    ) AS s
+                    WHERE c.id = s.id
+                      AND (c.submission_count, c.solved_count)
+                          IS DISTINCT FROM (s.total, s.solved)
+                    """,
+                    [Submission.Status.ACCEPTED]
+                )
+                return cursor.rowcount
+        
+        submission_count, solved_count = cls.submission_count_expressions()
+        return cls.objects.alias(
+            actual_submissions=submission_count,
+            actual_solved=solved_count
+        ).exclude(
+            submission_count=models.F('actual_submissions'),
+            solved_count=models.F('actual_solved')
+        ).update(
+            submission_count=submission_count,
+            solved_count=solved_count,
+            success_rate=cls.success_rate_expression(solved_count, submission_count)
+        )
+    
+    @classmethod
+    def increment_submission(cls, pk):
+        """Atomically increment the cached submission count."""
+        return cls.update_submission_stats(
+            pk, submission_count=models.F('submission_count') + 1
+        )
+    
+    @classmethod
+    def apply_rating_change(cls, pk, rating_delta, count_delta):
+        """Atomically adjust the cached rating totals and average rating."""
+        new_sum = models.F('rating_sum') + rating_delta
+        new_count = models.F('rating_count') + count_delta
+        return cls.objects.filter(pk=pk).update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            average_rating=models.Case(
+                models.When(rating_count=-count_delta, then=None),
+                default=Round(Cast(new_sum, models.FloatField()) / new_count, 2),
+                output_field=models.FloatField()
+            )
+        )
+    
+    @classmethod
+    def refresh_rating_stats(cls, pk):
+        """Recalculate one challenge's rating totals in a single UPDATE."""
+        ratings = ChallengeRating.objects.filter(
+            challenge=models.OuterRef('pk')
+        ).order_by().values('challenge')
+        rating_sum = ratings.annotate(total=models.Sum('rating')).values('total')
+        rating_count = ratings.annotate(total=models.Count('id')).values('total')
+        average = ratings.annotate(average=models.Avg('rating')).values('average')
+        return cls.objects.filter(pk=pk).update(
+            rating_sum=Coalesce(models.Subquery(rating_sum), 0),
+            rating_count=Coalesce(models.Subquery(rating_count), 0),
+            average_rating=Round(models.Subquery(average), 2)
+        )
     
     def save(self, *args, **kwargs):
-        """Override save to set published_at when status changes to published and generate slug."""
-        if not self.slug:
-            self.slug = slugify(self.title)
+        """Override save to set published_at when status changes to published.
         
-        if self.status == self.Status.PUBLISHED and not self.published_at:
-            self.published_at = timezone.now()
-        elif self.status != self.Status.PUBLISHED:
-            self.published_at = None
+        Saves restricted to update_fields that leave out status skip this,
+        so narrow writes only touch the columns they name.
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'status' in update_fields:
+            published_at = self.published_at
+            if self.status == self.Status.PUBLISHED and not self.published_at:
+                self.published_at = timezone.now()
+            elif self.status != self.Status.PUBLISHED:
+                self.published_at = None
+            if update_fields is not None and self.published_at != published_at:
+                kwargs['update_fields'] = {*update_fields, 'published_at'}
         
         super().save(*args, **kwargs)
 
 
+@receiver(pre_save, sender=Challenge)
+def set_challenge_slug(sender, instance, **kwargs):
+    """Generate the slug once, when a new challenge is saved without one."""
+    if instance._state.adding and not instance.slug:
+        instance.slug = slugify(instance.title)
+
+
+# Reward percentage by execution time in tenths of the time limit:
+# 20% bonus under half the limit, 10% under 0.8 of it.
+TIME_BONUS_PERCENT = (120, 120, 120, 120, 120, 110, 110, 110, 100, 100, 100)
+PARTIAL_CREDIT_PERCENT = 30
+
+
 class Submission(models.Model):
     """Model for challenge submissions."""
     
@@ -264,10 +517,6 @@ class Submission(models.Model):
     )
     
     # Test Case Results
-    test_results = models.JSONField(
-        default=list,
-        help_text="Results for each test case"
-    )
     passed_test_cases = models.PositiveIntegerField(default=0)
     total_test_cases = models.PositiveIntegerField(default=0)
     
@@ -292,9 +541,24 @@ class Submission(models.Model):
     class Meta:
         ordering = ['-submitted_at']
         indexes = [
-            models.Index(fields=['challenge', 'user']),
+            models.Index(fields=['challenge', 'user', '-submitted_at']),
+            models.Index(
+                fields=['challenge', 'status', '-score', 'execution_time'],
+                name='sub_chal_stat_score_i'
+            ),
             models.Index(fields=['status', 'submitted_at']),
             models.Index(fields=['user', 'submitted_at']),
+            models.Index(
+                fields=['user', 'status', '-submitted_at'],
+                include=['challenge', 'score'],
+                name='sub_user_status_sub_i'
+            ),
+            models.Index(fields=['challenge', '-submitted_at']),
+            BrinIndex(
+                fields=['submitted_at'],
+                pages_per_range=32,
+                name='sub_submitted_brin'
+            ),
         ]
         unique_together = []
     
@@ -314,34 +578,101 @@ class Submission(models.Model):
         return round((self.passed_test_cases / self.total_test_cases) * 100, 1)
     
     def save(self, *args, **kwargs):
-        """Override save to set evaluation timestamp and calculate points."""
+        """Override save to set evaluation timestamp."""
         if self.status != self.Status.PENDING and not self.evaluated_at:
             self.evaluated_at = timezone.now()
         
-        # Calculate points and XP based on performance
+        super().save(*args, **kwargs)
+    
+    def finalize(self, challenge):
+        """Set the points and XP earned, using an already-loaded challenge."""
+        self.points_earned, self.xp_earned = self.compute_rewards(challenge)
+    
+    def compute_rewards(self, challenge):
+        """Return the (points, xp) this submission earns on the given challenge."""
         if self.is_accepted:
-            base_points = self.challenge.points_reward
-            base_xp = self.challenge.xp_reward
-            
-            # Bonus for efficiency (faster execution)
-            time_bonus = 1.0
-            if self.execution_time and self.challenge.time_limit:
-                time_ratio = self.execution_time / self.challenge.time_limit
-                if time_ratio < 0.5:
-                    time_bonus = 1.2  # 20% bonus for very fast solutions
-                elif time_ratio < 0.8:
-                    time_bonus = 1.1  # 10% bonus for fast solutions
+            # Bonus for efficiency (faster execution), by tenths of the limit
+            percent = 100
+            if self.execution_time and challenge.time_limit:
+                tenths = min(self.execution_time * 10 // challenge.time_limit, 10)
+                percent = TIME_BONUS_PERCENT[tenths]
             
-            self.points_earned = int(base_points * time_bonus)
-            self.xp_earned = int(base_xp * time_bonus)
-        else:
-            # Partial points for partial solutions
-            if self.total_test_cases > 0:
-                partial_ratio = self.passed_test_cases / self.total_test_cases
-                self.points_earned = int(self.challenge.points_reward * partial_ratio * 0.3)
-                self.xp_earned = int(self.challenge.xp_reward * partial_ratio * 0.3)
+            return (
+                challenge.points_reward * percent // 100,
+                challenge.xp_reward * percent // 100
+            )
         
-        super().save(*args, **kwargs)
+        # Partial points for partial solutions
+        if self.total_test_cases > 0:
+            scale = self.passed_test_cases * PARTIAL_CREDIT_PERCENT
+            divisor = self.total_test_cases * 100
+            return (
+                challenge.points_reward * scale // divisor,
+                challenge.xp_reward * scale // divisor
+            )
+        
+        return 0, 0
+
+
+class ChallengeTestCase(models.Model):
+    """Model for a single input/expected output pair of a challenge."""
+    
+    challenge = models.ForeignKey(
+        Challenge,
+        on_delete=models.CASCADE,
+        related_name='test_cases'
+    )
+    ordinal = models.PositiveIntegerField(default=0)
+    is_hidden = models.BooleanField(
+        default=False,
+        help_text="Hidden test cases are only used for evaluation"
+    )
+    input = models.TextField(blank=True)
+    expected_output = models.TextField()
+    
+    class Meta:
+        ordering = ['ordinal']
+        unique_together = ['challenge', 'ordinal']
+        indexes = [
+            models.Index(fields=['challenge', 'is_hidden', 'ordinal']),
+        ]
+    
+    def __str__(self):
+        return f"{self.challenge.title} - Test case {self.ordinal}"
+    
+    @staticmethod
+    def as_text(value):
+        """Return a JSON test case value as column text.
+        
+        Strings are stored as they are and anything else as JSON, so
+        numbers, lists and objects survive the round trip.
+        """
+        return value if isinstance(value, str) else json.dumps(value)
+
+
+class SubmissionTestResult(models.Model):
+    """Model for the outcome of one test case in a submission."""
+    
+    submission = models.ForeignKey(
+        Submission,
+        on_delete=models.CASCADE,
+        related_name='test_results'
+    )
+    test_case = models.ForeignKey(
+        ChallengeTestCase,
+        on_delete=models.CASCADE,
+        related_name='results'
+    )
+    passed = models.BooleanField(default=False)
+    runtime_ms = models.PositiveIntegerField(null=True, blank=True)
+    memory_kb = models.PositiveIntegerField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        unique_together = ['submission', 'test_case']
+    
+    def __str__(self):
+        return f"Submission {self.submission_id} - Test case {self.test_case_id}"
 
 
 class ChallengeRating(models.Model):
@@ -386,15 +717,24 @@ class ChallengeRating(models.Model):
     
     def __str__(self):
         return f"{self.user.email} rated {self.challenge.title}: {self.rating}/5"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored rating so updates can adjust the cached totals
+        instance._loaded_rating = instance.__dict__.get('rating')
+        return instance
 
 
 class ChallengeFavorite(models.Model):
     """Model for user's favorite challenges."""
     
+    # unique_together already leads with user, so skip the FK's own index
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='favorite_challenges'
+        related_name='favorite_challenges',
+        db_index=False
     )
     challenge = models.ForeignKey(
         Challenge,
@@ -407,6 +747,9 @@ class ChallengeFavorite(models.Model):
     class Meta:
         unique_together = ['user', 'challenge']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='fav_user_created_i'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} favorited {self.challenge.title}"
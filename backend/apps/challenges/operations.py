@@ -0,0 +1,58 @@
+from django.contrib.postgres.indexes import PostgresIndex
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently as PostgresAddIndexConcurrently,
+    RemoveIndexConcurrently as PostgresRemoveIndexConcurrently,
+)
+from django.db.migrations.operations import AddIndex, RemoveIndex
+
+
+def _is_portable(index):
+    """Return whether an index can be created on non-PostgreSQL databases."""
+    return not isinstance(index, PostgresIndex)
+
+
+class AddIndexConcurrently(PostgresAddIndexConcurrently):
+    """
+    Create an index without locking writes on PostgreSQL.
+    
+    Other databases (SQLite in development and tests) fall back to a plain
+    CREATE INDEX so the migrations stay portable. PostgreSQL-only index
+    types such as BRIN are skipped there.
+    """
+    
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        elif _is_portable(self.index):
+            AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+    
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        elif _is_portable(self.index):
+            AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class RemoveIndexConcurrently(PostgresRemoveIndexConcurrently):
+    """
+    Drop an index without locking writes on PostgreSQL.
+    
+    Other databases fall back to a plain DROP INDEX, skipping indexes that
+    were never created there.
+    """
+    
+    def _get_index(self, app_label, state):
+        model_state = state.models[app_label, self.model_name_lower]
+        return model_state.get_index_by_name(self.name)
+    
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        elif _is_portable(self._get_index(app_label, from_state)):
+            RemoveIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+    
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        elif _is_portable(self._get_index(app_label, to_state)):
+            RemoveIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,40 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that estimates the size of large, unfiltered tables.
+    
+    Reads the planner statistics in pg_class instead of running COUNT(*).
+    Filtered querysets, small tables and non-PostgreSQL databases fall back
+    to an exact count.
+    """
+    
+    exact_count_threshold = 10000
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            
+            if row and row[0] >= self.exact_count_threshold:
+                return row[0]
+        
+        return super().count
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """Page number pagination backed by EstimatedCountPaginator."""
+    
+    django_paginator_class = EstimatedCountPaginator
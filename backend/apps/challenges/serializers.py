@@ -1,11 +1,15 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
+from apps.content.models import Category, Tag
 from apps.content.serializers import CategorySerializer, TagSerializer
 from apps.users.serializers import PublicUserProfileSerializer, PublicUserSerializer
 from .models import (
     Challenge, Submission, ChallengeRating,
-    ChallengeFavorite, ChallengeDiscussion
+    ChallengeFavorite, ChallengeDiscussion,
+    ChallengeTestCase, SubmissionTestResult
 )
 
 User = get_user_model()
@@ -26,9 +30,9 @@ class ChallengeListSerializer(serializers.ModelSerializer):
         max_digits=3, decimal_places=2, read_only=True
     )
     
-    # User-specific fields
-    is_solved = serializers.SerializerMethodField()
-    is_favorited = serializers.SerializerMethodField()
+    # User-specific fields, annotated by ChallengeQuerySet.with_*_flag()
+    is_solved = serializers.BooleanField(read_only=True, default=False)
+    is_favorited = serializers.BooleanField(read_only=True, default=False)
     user_best_submission = serializers.SerializerMethodField()
     
     class Meta:
@@ -42,31 +46,18 @@ class ChallengeListSerializer(serializers.ModelSerializer):
             'is_solved', 'is_favorited', 'user_best_submission'
         ]
     
-    def get_is_solved(self, obj):
-        """Check if current user has solved this challenge."""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.submissions.filter(
-                user=request.user,
-                status=Submission.Status.ACCEPTED
-            ).exists()
-        return False
-    
-    def get_is_favorited(self, obj):
-        """Check if current user has favorited this challenge."""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.favorited_by.filter(user=request.user).exists()
-        return False
-    
     def get_user_best_submission(self, obj):
         """Get user's best submission for this challenge."""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            best_submission = obj.submissions.filter(
-                user=request.user
-            ).order_by('-score', 'execution_time').first()
+            if not hasattr(obj, 'user_best_submissions'):
+                return obj.submissions.filter(
+                    user=request.user
+                ).order_by('-score', 'execution_time').values(
+                    'id', 'status', 'score', 'execution_time', 'submitted_at'
+                ).first()
             
+            best_submission = next(iter(obj.user_best_submissions), None)
             if best_submission:
                 return {
                     'id': best_submission.id,
@@ -93,12 +84,22 @@ class ChallengeDetailSerializer(serializers.ModelSerializer):
         max_digits=3, decimal_places=2, read_only=True
     )
     
-    # User-specific fields
-    is_solved = serializers.SerializerMethodField()
-    is_favorited = serializers.SerializerMethodField()
+    # User-specific fields, annotated by ChallengeQuerySet.with_*_flag()
+    is_solved = serializers.BooleanField(read_only=True, default=False)
+    is_favorited = serializers.BooleanField(read_only=True, default=False)
     user_submissions = serializers.SerializerMethodField()
     user_rating = serializers.SerializerMethodField()
     
+    # Rendered on every request; everything else is cached per version.
+    # Category and tags are edited without touching the challenge, so
+    # they are rendered live from the prefetched relations.
+    live_fields = [
+        'category', 'tags', 'author', 'submission_count', 'solved_count', 'success_rate',
+        'average_rating', 'is_solved', 'is_favorited', 'user_submissions',
+        'user_rating'
+    ]
+    cache_timeout = 60 * 60
+    
     class Meta:
         model = Challenge
         fields = [
@@ -112,40 +113,43 @@ class ChallengeDetailSerializer(serializers.ModelSerializer):
             'user_submissions', 'user_rating'
         ]
     
-    def get_is_solved(self, obj):
-        """Check if current user has solved this challenge."""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.submissions.filter(
-                user=request.user,
-                status=Submission.Status.ACCEPTED
-            ).exists()
-        return False
-    
-    def get_is_favorited(self, obj):
-        """Check if current user has favorited this challenge."""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.favorited_by.filter(user=request.user).exists()
-        return False
+    def to_representation(self, instance):
+        """Serialize the challenge, reusing the cached version-stable part.
+        
+        The cache key includes updated_at, so every save moves readers to a
+        fresh key and no explicit invalidation is needed. Related rows that
+        change on their own are listed in live_fields instead.
+        """
+        cache_key = (
+            f'challenge:detail:{instance.pk}:{instance.updated_at.timestamp()}'
+        )
+        cached = cache.get(cache_key)
+        if cached is None:
+            data = super().to_representation(instance)
+            cache.set(cache_key, {
+                name: value for name, value in data.items()
+                if name not in self.live_fields
+            }, self.cache_timeout)
+            return data
+        
+        for name in self.live_fields:
+            field = self.fields[name]
+            attribute = field.get_attribute(instance)
+            cached[name] = (
+                None if attribute is None else field.to_representation(attribute)
+            )
+        return {name: cached[name] for name in self.Meta.fields}
     
     def get_user_submissions(self, obj):
         """Get current user's submissions for this challenge."""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            submissions = obj.submissions.filter(
+            return list(obj.submissions.filter(
                 user=request.user
-            ).order_by('-submitted_at')[:5]  # Last 5 submissions
-            
-            return [{
-                'id': sub.id,
-                'status': sub.status,
-                'score': sub.score,
-                'language': sub.language,
-                'execution_time': sub.execution_time,
-                'memory_used': sub.memory_used,
-                'submitted_at': sub.submitted_at
-            } for sub in submissions]
+            ).order_by('-submitted_at').values(
+                'id', 'status', 'score', 'language', 'execution_time',
+                'memory_used', 'submitted_at'
+            )[:5])  # Last 5 submissions
         return []
     
     def get_user_rating(self, obj):
@@ -166,12 +170,30 @@ class ChallengeDetailSerializer(serializers.ModelSerializer):
 class ChallengeCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating/updating challenges."""
     
+    # Allowed points_reward range per difficulty level
+    DIFFICULTY_POINT_RANGES = {
+        Challenge.DifficultyLevel.BEGINNER: (50, 200),
+        Challenge.DifficultyLevel.INTERMEDIATE: (100, 400),
+        Challenge.DifficultyLevel.ADVANCED: (200, 600),
+        Challenge.DifficultyLevel.EXPERT: (300, 1000),
+    }
+    
     category_id = serializers.IntegerField(write_only=True, required=False)
     tag_ids = serializers.ListField(
         child=serializers.IntegerField(),
         write_only=True,
         required=False
     )
+    test_cases = serializers.ListField(
+        child=serializers.DictField(),
+        write_only=True,
+        required=False
+    )
+    hidden_test_cases = serializers.ListField(
+        child=serializers.DictField(),
+        write_only=True,
+        required=False
+    )
     
     class Meta:
         model = Challenge
@@ -229,18 +251,77 @@ class ChallengeCreateSerializer(serializers.ModelSerializer):
         
         return value
     
+    def validate_hidden_test_cases(self, value):
+        """Validate hidden test cases format."""
+        for i, test_case in enumerate(value):
+            for field in ['input', 'expected_output']:
+                if field not in test_case:
+                    raise serializers.ValidationError(
+                        f"Hidden test case {i+1} must have '{field}' field."
+                    )
+        
+        return value
+    
+    def validate_tag_ids(self, value):
+        """Validate that every tag ID exists."""
+        existing = set(
+            Tag.objects.filter(id__in=value).values_list('id', flat=True)
+        )
+        missing = sorted(set(value) - existing)
+        if missing:
+            raise serializers.ValidationError(
+                f"Invalid tag IDs: {', '.join(map(str, missing))}."
+            )
+        
+        return value
+    
+    def _save_test_cases(self, challenge, test_cases, hidden_test_cases):
+        """Write the challenge's test case rows by ordinal, visible ones first.
+        
+        Rows are updated in place and only ordinals past the new end are
+        deleted, so stored submission results are not cascaded away.
+        """
+        cases = [(False, case) for case in test_cases]
+        cases += [(True, case) for case in hidden_test_cases]
+        
+        existing = {case.ordinal: case for case in challenge.test_cases.all()}
+        created = []
+        changed = []
+        for ordinal, (is_hidden, case) in enumerate(cases):
+            values = {
+                'is_hidden': is_hidden,
+                'input': ChallengeTestCase.as_text(case['input']),
+                'expected_output': ChallengeTestCase.as_text(case['expected_output'])
+            }
+            test_case = existing.pop(ordinal, None)
+            if test_case is None:
+                created.append(
+                    ChallengeTestCase(challenge=challenge, ordinal=ordinal, **values)
+                )
+            elif any(
+                getattr(test_case, field) != value
+                for field, value in values.items()
+            ):
+                for field, value in values.items():
+                    setattr(test_case, field, value)
+                changed.append(test_case)
+        
+        if existing:
+            ChallengeTestCase.objects.filter(
+                pk__in=[case.pk for case in existing.values()]
+            ).delete()
+        if changed:
+            ChallengeTestCase.objects.bulk_update(
+                changed, ['is_hidden', 'input', 'expected_output']
+            )
+        if created:
+            ChallengeTestCase.objects.bulk_create(created)
+    
     def validate_points_reward(self, value):
         """Validate points reward based on difficulty."""
-        difficulty_points = {
-            Challenge.DifficultyLevel.BEGINNER: (50, 200),
-            Challenge.DifficultyLevel.INTERMEDIATE: (100, 400),
-            Challenge.DifficultyLevel.ADVANCED: (200, 600),
-            Challenge.DifficultyLevel.EXPERT: (300, 1000),
-        }
-        
         difficulty = self.initial_data.get('difficulty_level')
-        if difficulty and difficulty in difficulty_points:
-            min_points, max_points = difficulty_points[difficulty]
+        if difficulty and difficulty in self.DIFFICULTY_POINT_RANGES:
+            min_points, max_points = self.DIFFICULTY_POINT_RANGES[difficulty]
             if not (min_points <= value <= max_points):
                 raise serializers.ValidationError(
                     f"Points for {difficulty} difficulty should be between "
@@ -253,13 +334,14 @@ class ChallengeCreateSerializer(serializers.ModelSerializer):
         """Create challenge with relationships."""
         category_id = validated_data.pop('category_id', None)
         tag_ids = validated_data.pop('tag_ids', [])
+        test_cases = validated_data.pop('test_cases', [])
+        hidden_test_cases = validated_data.pop('hidden_test_cases', [])
         
         # Set author from request user
         validated_data['author'] = self.context['request'].user
         
         # Set category
         if category_id:
-            from apps.content.models import Category
             try:
                 validated_data['category'] = Category.objects.get(id=category_id)
             except Category.DoesNotExist:
@@ -267,13 +349,15 @@ class ChallengeCreateSerializer(serializers.ModelSerializer):
                     {'category_id': 'Invalid category ID.'}
                 )
         
-        challenge = Challenge.objects.create(**validated_data)
-        
-        # Set tags
-        if tag_ids:
-            from apps.content.models import Tag
-            tags = Tag.objects.filter(id__in=tag_ids)
-            challenge.tags.set(tags)
+        with transaction.atomic():
+            challenge = Challenge.objects.create(**validated_data)
+            
+            # Set tags
+            if tag_ids:
+                challenge.tags.set(tag_ids)
+            
+            if test_cases or hidden_test_cases:
+                self._save_test_cases(challenge, test_cases, hidden_test_cases)
         
         return challenge
     
@@ -281,11 +365,12 @@ class ChallengeCreateSerializer(serializers.ModelSerializer):
         """Update challenge with relationships."""
         category_id = validated_data.pop('category_id', None)
         tag_ids = validated_data.pop('tag_ids', None)
+        test_cases = validated_data.pop('test_cases', None)
+        hidden_test_cases = validated_data.pop('hidden_test_cases', None)
         
         # Update category
         if category_id is not None:
             if category_id:
-                from apps.content.models import Category
                 try:
                     validated_data['category'] = Category.objects.get(id=category_id)
                 except Category.DoesNotExist:
@@ -295,18 +380,32 @@ class ChallengeCreateSerializer(serializers.ModelSerializer):
             else:
                 validated_data['category'] = None
         
-        # Update challenge
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-        
-        # Update tags
-        if tag_ids is not None:
-            from apps.content.models import Tag
-            tags = Tag.objects.filter(id__in=tag_ids)
-            instance.tags.set(tags)
+        with transaction.atomic():
+            # Update challenge
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+            
+            # Update tags
+            if tag_ids is not None:
+                instance.tags.set(tag_ids)
+            
+            # Rewrite test cases, keeping whichever half was not sent
+            if test_cases is not None or hidden_test_cases is not None:
+                if test_cases is None:
+                    test_cases = self._test_case_payload(instance, hidden=False)
+                if hidden_test_cases is None:
+                    hidden_test_cases = self._test_case_payload(instance, hidden=True)
+                self._save_test_cases(instance, test_cases, hidden_test_cases)
         
         return instance
+    
+    def _test_case_payload(self, challenge, hidden):
+        """Return existing test cases in the request payload format."""
+        return list(
+            challenge.test_cases.filter(is_hidden=hidden)
+            .values('input', 'expected_output')
+        )
 
 
 class SubmissionSerializer(serializers.ModelSerializer):
@@ -343,6 +442,8 @@ class SubmissionCreateSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(
                     "Cannot submit to unpublished challenge."
                 )
+            # Reused by create() to avoid fetching the challenge twice
+            self.context['_challenge_obj'] = challenge
             return value
         except Challenge.DoesNotExist:
             raise serializers.ValidationError("Invalid challenge ID.")
@@ -361,19 +462,26 @@ class SubmissionCreateSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         """Create submission."""
-        challenge_id = validated_data.pop('challenge_id')
-        challenge = Challenge.objects.get(id=challenge_id)
-        
-        validated_data['challenge'] = challenge
+        validated_data.pop('challenge_id')
+        validated_data['challenge'] = self.context['_challenge_obj']
         validated_data['user'] = self.context['request'].user
         
         return Submission.objects.create(**validated_data)
 
 
+class SubmissionTestResultSerializer(serializers.ModelSerializer):
+    """Serializer for per-test-case submission results."""
+    
+    class Meta:
+        model = SubmissionTestResult
+        fields = ['test_case', 'passed', 'runtime_ms', 'memory_kb']
+
+
 class SubmissionDetailSerializer(serializers.ModelSerializer):
     """Serializer for detailed submission view (includes code)."""
     
     challenge = ChallengeListSerializer(read_only=True)
+    test_results = SubmissionTestResultSerializer(many=True, read_only=True)
     user = PublicUserSerializer(read_only=True)
     success_rate = serializers.ReadOnlyField()
     
@@ -455,12 +563,17 @@ class ChallengeDiscussionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['challenge', 'user', 'is_approved']
     
+    def _approved_replies(self, obj):
+        """Return approved replies, using the viewset's prefetch if present."""
+        if hasattr(obj, 'approved_replies'):
+            return obj.approved_replies
+        return obj.replies.filter(is_approved=True).order_by('created_at')
+    
     def get_replies(self, obj):
         """Get replies to this discussion."""
-        if obj.parent is None:  # Only get replies for top-level discussions
-            replies = obj.replies.filter(is_approved=True).order_by('created_at')
+        if obj.parent_id is None:  # Only get replies for top-level discussions
             return ChallengeDiscussionSerializer(
-                replies,
+                self._approved_replies(obj),
                 many=True,
                 context=self.context
             ).data
@@ -468,6 +581,8 @@ class ChallengeDiscussionSerializer(serializers.ModelSerializer):
     
     def get_reply_count(self, obj):
         """Get number of replies."""
+        if hasattr(obj, 'approved_replies'):
+            return len(obj.approved_replies)
         return obj.replies.filter(is_approved=True).count()
     
     def create(self, validated_data):
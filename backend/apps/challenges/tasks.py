@@ -0,0 +1,150 @@
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from apps.gamification.models import Badge, UserBadge
+from .models import Challenge, Submission, SubmissionTestResult
+
+User = get_user_model()
+
+# Columns written back once a submission has been evaluated
+EVALUATION_FIELDS = [
+    'status', 'score', 'points_earned', 'xp_earned', 'execution_time',
+    'memory_used', 'evaluated_at', 'passed_test_cases', 'total_test_cases',
+    'error_message', 'compilation_output'
+]
+
+
+def get_submission_evaluator():
+    """Return the configured submission evaluator, or None if there is none.
+    
+    The evaluator is called with a submission whose challenge is loaded. It
+    sets the status and execution metrics on the submission and returns its
+    unsaved SubmissionTestResult rows, leaving the status pending if the
+    submission could not be run.
+    """
+    if not settings.SUBMISSION_EVALUATOR:
+        return None
+    return import_string(settings.SUBMISSION_EVALUATOR)
+
+
+@shared_task
+def evaluate_submissions_task(submission_ids):
+    """Evaluate a batch of pending submissions and save them in bulk."""
+    evaluator = get_submission_evaluator()
+    if evaluator is None:
+        return 0
+    
+    submissions = Submission.objects.filter(
+        pk__in=submission_ids,
+        status=Submission.Status.PENDING
+    ).select_related('challenge')
+    
+    finished = []
+    test_results = []
+    for submission in submissions:
+        results = evaluator(submission)
+        if submission.status == Submission.Status.PENDING:
+            continue
+        if results:
+            submission.passed_test_cases = sum(result.passed for result in results)
+            submission.total_test_cases = len(results)
+        finished.append(submission)
+        test_results.extend(results)
+    
+    save_evaluated_submissions(finished, test_results)
+    return len(finished)
+
+
+def queue_evaluation(submission_ids):
+    """Queue submissions for evaluation once the current transaction commits.
+    
+    Returns False, queueing nothing, when no evaluator is configured.
+    """
+    if get_submission_evaluator() is None:
+        return False
+    transaction.on_commit(lambda: evaluate_submissions_task.delay(submission_ids))
+    return True
+
+
+@shared_task
+def recompute_challenge_statistics():
+    """Correct any drift in the cached challenge submission counters."""
+    return Challenge.recompute_submission_stats()
+
+
+@shared_task
+def award_challenge_badges(user_id):
+    """Award the challenge-count badges a user has newly qualified for."""
+    solved = Submission.objects.filter(
+        user_id=user_id,
+        status=Submission.Status.ACCEPTED
+    ).values('challenge').distinct().count()
+    if not solved:
+        return 0
+    
+    user = User.objects.select_related('profile').get(pk=user_id)
+    badges = [
+        badge for badge in Badge.objects.filter(
+            is_active=True,
+            criteria__challenges_solved__lte=solved
+        ).exclude(
+            pk__in=UserBadge.objects.filter(user_id=user_id).values('badge')
+        )
+        if badge.check_criteria(user)
+    ]
+    if badges:
+        UserBadge.objects.bulk_create(
+            [UserBadge(user_id=user_id, badge=badge) for badge in badges],
+            ignore_conflicts=True
+        )
+        Badge.objects.filter(pk__in=[badge.pk for badge in badges]).update(
+            earned_count=F('earned_count') + 1
+        )
+    return len(badges)
+
+
+def save_evaluated_submissions(submissions, test_results=(), batch_size=1000):
+    """Score evaluated submissions and write them and their results in bulk."""
+    if not submissions:
+        return
+    
+    now = timezone.now()
+    for submission in submissions:
+        submission.finalize(submission.challenge)
+        if not submission.evaluated_at:
+            submission.evaluated_at = now
+    
+    with transaction.atomic():
+        Submission.objects.bulk_update(
+            submissions, EVALUATION_FIELDS, batch_size=batch_size
+        )
+        if test_results:
+            # Re-evaluated submissions replace their previous results
+            SubmissionTestResult.objects.filter(
+                submission_id__in={result.submission_id for result in test_results}
+            ).delete()
+            SubmissionTestResult.objects.bulk_create(
+                test_results, batch_size=batch_size
+            )
+    
+    # Recount the statistics once per challenge rather than once per row
+    for challenge_id in {submission.challenge_id for submission in submissions}:
+        Challenge.refresh_submission_stats(challenge_id)
+    
+    # bulk_update skips post_save, which the gamification receivers rely on,
+    # so send it once per row after the batched write.
+    for submission in submissions:
+        post_save.send(
+            sender=Submission,
+            instance=submission,
+            created=False,
+            update_fields=frozenset(EVALUATION_FIELDS),
+            raw=False,
+            using=Submission.objects.db,
+            statistics_refreshed=True
+        )
@@ -1,41 +1,69 @@
-from django.test import TestCase
-from django.contrib.auth import get_user_model
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib import admin
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
 from .models import (
-    Challenge, Submission, ChallengeRating, ChallengeFavorite, ChallengeDiscussion
+    Challenge, Submission, ChallengeRating, ChallengeFavorite, ChallengeDiscussion,
+    ChallengeTestCase, SubmissionTestResult
 )
-from apps.content.models import Category
+from .admin import SubmissionAdmin
+from .factories import (
+    CategoryFactory, ChallengeFactory, SubmissionFactory, UserFactory
+)
+from .serializers import ChallengeCreateSerializer
+from .signals import award_points_for_submission, check_badge_eligibility
+from .tasks import (
+    award_challenge_badges, evaluate_submissions_task, queue_evaluation,
+    save_evaluated_submissions
+)
+from apps.content.models import Tag
+from apps.gamification.models import Badge, UserBadge
 
-User = get_user_model()
 
+def accept_submission(submission):
+    """Evaluator used by the tests: passes every test case of the challenge."""
+    submission.status = Submission.Status.ACCEPTED
+    submission.execution_time = 40
+    return [
+        SubmissionTestResult(submission=submission, test_case=test_case, passed=True)
+        for test_case in submission.challenge.test_cases.all()
+    ]
 
-class ChallengeModelTest(TestCase):
-    """Test cases for Challenge model."""
+
+class ChallengeFixtureMixin:
+    """Create the challenge graph shared by the test cases below."""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
-            email='creator@example.com',
-            password='pass123',
-            first_name='Creator',
-            last_name='User'
-        )
-        self.category = Category.objects.create(
+    challenge_fields = {}
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = UserFactory(email='creator@example.com', first_name='Creator')
+        cls.category = CategoryFactory(
             name='Algorithms',
             description='Algorithm challenges'
         )
-        self.challenge = Challenge.objects.create(
+        cls.challenge = ChallengeFactory(
             title='Two Sum Problem',
             description='Find two numbers that add up to target',
             problem_statement='Given an array of integers...',
             difficulty_level='beginner',
-            category=self.category,
-            author=self.user,
-            time_limit=60,
-            memory_limit=128,
-            status='published'
+            category=cls.category,
+            author=cls.creator,
+            **cls.challenge_fields
         )
+
+
+class ChallengeModelTest(ChallengeFixtureMixin, TestCase):
+    """Test cases for Challenge model."""
+    
+    # Overrides for the shared fixture challenge
+    challenge_fields = {'time_limit': 60, 'memory_limit': 128}
     
     def test_challenge_creation(self):
         """Test challenge creation."""
@@ -51,40 +79,63 @@ class ChallengeModelTest(TestCase):
     def test_challenge_slug_generation(self):
         """Test that slug is generated automatically."""
         self.assertEqual(self.challenge.slug, 'two-sum-problem')
-
-
-class SubmissionModelTest(TestCase):
-    """Test cases for Submission model."""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
-            email='solver@example.com',
-            password='pass123',
-            first_name='Solver',
-            last_name='User'
+    def test_published_queryset(self):
+        """Test that published() excludes draft challenges."""
+        Challenge.objects.create(
+            title='Draft Problem',
+            description='Not ready yet',
+            problem_statement='...',
+            author=self.creator
         )
-        self.creator = User.objects.create_user(
-            email='creator@example.com',
-            password='pass123',
-            first_name='Creator',
-            last_name='User'
+        self.assertQuerySetEqual(
+            Challenge.objects.published(), [self.challenge]
         )
-        self.category = Category.objects.create(
-            name='Algorithms',
-            description='Algorithm challenges'
-        )
-        self.challenge = Challenge.objects.create(
-            title='Two Sum Problem',
-            description='Find two numbers that add up to target',
-            problem_statement='Given an array of integers...',
-            difficulty_level='beginner',
-            category=self.category,
-            author=self.creator,
-            status='published'
+    
+    def test_update_status_keeps_published_at(self):
+        """Test that bulk status updates set and clear published_at."""
+        published_at = self.challenge.published_at
+        challenges = Challenge.objects.filter(pk=self.challenge.pk)
+        challenges.update_status(Challenge.Status.PUBLISHED)
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.published_at, published_at)
+        
+        challenges.update_status(Challenge.Status.DRAFT)
+        self.challenge.refresh_from_db()
+        self.assertIsNone(self.challenge.published_at)
+        
+        challenges.update_status(Challenge.Status.PUBLISHED)
+        self.challenge.refresh_from_db()
+        self.assertIsNotNone(self.challenge.published_at)
+    
+    def test_update_content_bumps_updated_at(self):
+        """Test that bulk content updates move the detail cache version."""
+        updated_at = self.challenge.updated_at
+        Challenge.objects.filter(pk=self.challenge.pk).update_content(
+            is_featured=True
         )
-        self.submission = Submission.objects.create(
-            challenge=self.challenge,
-            user=self.user,
+        self.challenge.refresh_from_db()
+        self.assertTrue(self.challenge.is_featured)
+        self.assertGreater(self.challenge.updated_at, updated_at)
+    
+    def test_save_with_update_fields_adds_published_at(self):
+        """Test that a narrow status save also writes published_at."""
+        self.challenge.status = Challenge.Status.DRAFT
+        self.challenge.save(update_fields=['status'])
+        self.challenge.refresh_from_db()
+        self.assertIsNone(self.challenge.published_at)
+
+
+class SubmissionModelTest(ChallengeFixtureMixin, TestCase):
+    """Test cases for Submission model."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = UserFactory(email='solver@example.com', first_name='Solver')
+        cls.submission = Submission.objects.create(
+            challenge=cls.challenge,
+            user=cls.user,
             code='def two_sum(nums, target): pass',
             language='python',
             status='pending'
@@ -101,40 +152,289 @@ class SubmissionModelTest(TestCase):
         """Test submission string representation."""
         expected = f'{self.user.email} - {self.challenge.title} ({self.submission.status})'
         self.assertEqual(str(self.submission), expected)
-
-
-class ChallengeRatingModelTest(TestCase):
-    """Test cases for ChallengeRating model."""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
-            email='rater@example.com',
-            password='pass123',
-            first_name='Rater',
-            last_name='User'
+    def test_submission_count_tracks_create_and_delete(self):
+        """Test that the cached submission count follows saves and deletes."""
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.submission_count, 1)
+        
+        self.submission.delete()
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.submission_count, 0)
+    
+    def test_challenge_delete_skips_statistics_recount(self):
+        """Test that cascaded submission deletes do not recount statistics."""
+        challenge_pk = self.challenge.pk
+        with CaptureQueriesContext(connection) as queries:
+            self.challenge.delete()
+        
+        self.assertFalse(Submission.objects.filter(challenge_id=challenge_pk).exists())
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ))
+    
+    def test_success_rate_follows_counters(self):
+        """Test that the stored success rate is updated with the counters."""
+        Submission.objects.create(
+            challenge=self.challenge,
+            user=self.user,
+            code='def two_sum(nums, target): return [0, 1]',
+            language='python',
+            status='accepted'
+        )
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.success_rate, Decimal('50.0'))
+        
+        Submission.objects.create(
+            challenge=self.challenge,
+            user=self.user,
+            code='def two_sum(nums, target): pass',
+            language='python'
         )
-        self.creator = User.objects.create_user(
-            email='creator@example.com',
-            password='pass123',
-            first_name='Creator',
-            last_name='User'
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.success_rate, Decimal('33.3'))
+    
+    def test_evaluated_submission_recounts_in_one_update(self):
+        """Test that saving an evaluated submission recounts in one statement."""
+        with CaptureQueriesContext(connection) as queries:
+            Submission.objects.create(
+                challenge=self.challenge,
+                user=self.user,
+                code='def two_sum(nums, target): return [0, 1]',
+                language='python',
+                status='accepted'
+            )
+        
+        statements = [
+            query['sql'] for query in queries.captured_queries
+            if 'challenges_challenge' in query['sql']
+        ]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('UPDATE'))
+        self.challenge.refresh_from_db()
+        self.assertEqual(
+            (self.challenge.submission_count, self.challenge.solved_count), (2, 1)
         )
-        self.category = Category.objects.create(
-            name='Algorithms',
-            description='Algorithm challenges'
+    
+    def test_save_without_status_skips_receivers(self):
+        """Test that saves leaving status alone skip the status receivers."""
+        self.submission.status = 'wrong_answer'
+        self.submission.save()
+        
+        self.submission.code = 'def two_sum(nums, target): return []'
+        with CaptureQueriesContext(connection) as queries:
+            self.submission.save(update_fields=['code'])
+        self.assertEqual(len(queries), 1)
+    
+    def test_recompute_submission_stats_fixes_drift(self):
+        """Test that the bulk recompute only rewrites drifted counters."""
+        Challenge.objects.filter(pk=self.challenge.pk).update(
+            submission_count=5, solved_count=2, success_rate=40
         )
-        self.challenge = Challenge.objects.create(
-            title='Two Sum Problem',
-            description='Find two numbers that add up to target',
-            problem_statement='Given an array of integers...',
-            difficulty_level='beginner',
-            category=self.category,
-            author=self.creator,
-            status='published'
+        self.assertEqual(Challenge.recompute_submission_stats(), 1)
+        
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.submission_count, 1)
+        self.assertEqual(self.challenge.solved_count, 0)
+        self.assertEqual(self.challenge.success_rate, 0)
+        self.assertEqual(Challenge.recompute_submission_stats(), 0)
+    
+    def test_save_evaluated_submissions_writes_results(self):
+        """Test that buffered test results are written with the submission."""
+        test_case = ChallengeTestCase.objects.create(
+            challenge=self.challenge,
+            ordinal=0,
+            input='[2, 7] 9',
+            expected_output='[0, 1]'
         )
-        self.rating = ChallengeRating.objects.create(
+        self.submission.status = 'wrong_answer'
+        self.submission.passed_test_cases = 0
+        self.submission.total_test_cases = 1
+        save_evaluated_submissions([self.submission], [
+            SubmissionTestResult(
+                submission=self.submission,
+                test_case=test_case,
+                passed=False,
+                runtime_ms=12
+            )
+        ])
+        
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, 'wrong_answer')
+        self.assertIsNotNone(self.submission.evaluated_at)
+        self.assertEqual(
+            list(self.submission.test_results.values_list('passed', 'runtime_ms')),
+            [(False, 12)]
+        )
+    
+    def test_save_evaluated_submissions_recounts_once_per_challenge(self):
+        """Test that a batch recounts each challenge's statistics once."""
+        second = SubmissionFactory(challenge=self.challenge, user=self.user)
+        self.submission.status = 'accepted'
+        second.status = 'wrong_answer'
+        with CaptureQueriesContext(connection) as queries:
+            save_evaluated_submissions([self.submission, second])
+        
+        recounts = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "challenges_challenge"')
+        ]
+        self.assertEqual(len(recounts), 1)
+        self.challenge.refresh_from_db()
+        self.assertEqual(
+            (self.challenge.submission_count, self.challenge.solved_count), (2, 1)
+        )
+    
+    @override_settings(SUBMISSION_EVALUATOR='apps.challenges.tests.accept_submission')
+    def test_evaluate_submissions_task_saves_results(self):
+        """Test that the evaluation task scores and saves pending submissions."""
+        ChallengeTestCase.objects.create(
+            challenge=self.challenge, ordinal=0, input='1', expected_output='1'
+        )
+        self.assertEqual(evaluate_submissions_task([self.submission.pk]), 1)
+        
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, 'accepted')
+        self.assertEqual(
+            (self.submission.passed_test_cases, self.submission.total_test_cases),
+            (1, 1)
+        )
+        self.assertGreater(self.submission.points_earned, 0)
+        self.assertEqual(self.submission.test_results.count(), 1)
+    
+    @override_settings(SUBMISSION_EVALUATOR='apps.challenges.tests.accept_submission')
+    def test_queue_evaluation_dispatches_after_commit(self):
+        """Test that queued evaluations are only dispatched after commit."""
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(queue_evaluation([self.submission.pk]))
+        self.assertEqual(len(callbacks), 1)
+    
+    def test_evaluate_submissions_task_needs_evaluator(self):
+        """Test that nothing is evaluated without a configured evaluator."""
+        self.assertEqual(evaluate_submissions_task([self.submission.pk]), 0)
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, 'pending')
+    
+    def test_award_points_updates_profile_in_place(self):
+        """Test that only the first accepted submission adds profile points."""
+        self.submission.status = 'accepted'
+        self.submission.points_earned = 120
+        self.submission.xp_earned = 60
+        award_points_for_submission(
+            sender=Submission, instance=self.submission, created=False
+        )
+        
+        # Once an earlier accepted submission exists nothing more is awarded
+        Submission.objects.create(
+            challenge=self.challenge,
+            user=self.user,
+            code='def two_sum(nums, target): pass',
+            language='python',
+            status='accepted'
+        )
+        self.submission.submitted_at = timezone.now() + timedelta(minutes=1)
+        award_points_for_submission(
+            sender=Submission, instance=self.submission, created=False
+        )
+        
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.total_points, 120)
+        self.assertEqual(self.user.profile.experience_points, 60)
+    
+    def test_accepted_evaluation_awards_points_once(self):
+        """Test that saving an accepted evaluation runs the receivers cleanly."""
+        self.submission.status = 'accepted'
+        save_evaluated_submissions([self.submission])
+        
+        self.user.profile.refresh_from_db()
+        self.assertGreater(self.submission.points_earned, 0)
+        self.assertEqual(
+            self.user.profile.total_points, self.submission.points_earned
+        )
+    
+    def test_admin_save_applies_rewards(self):
+        """Test that accepting a submission in the admin awards its points."""
+        self.submission.status = 'accepted'
+        SubmissionAdmin(Submission, admin.site).save_model(
+            None, self.submission, None, True
+        )
+        
+        self.submission.refresh_from_db()
+        self.user.profile.refresh_from_db()
+        self.assertGreater(self.submission.points_earned, 0)
+        self.assertEqual(
+            self.user.profile.total_points, self.submission.points_earned
+        )
+    
+    def test_badge_check_is_queued_after_commit(self):
+        """Test that accepted submissions defer the badge check to a task."""
+        self.submission.status = 'accepted'
+        with self.captureOnCommitCallbacks() as callbacks:
+            check_badge_eligibility(
+                sender=Submission, instance=self.submission, created=False
+            )
+        self.assertEqual(len(callbacks), 1)
+    
+    def test_award_challenge_badges(self):
+        """Test that badges are awarded once their solved count is reached."""
+        first = Badge.objects.create(
+            name='Problem Solver',
+            description='Solve your first coding challenge',
+            icon='💡',
+            criteria={'challenges_solved': 1}
+        )
+        Badge.objects.create(
+            name='Challenge Champion',
+            description='Solve 50 coding challenges',
+            icon='🏆',
+            criteria={'challenges_solved': 50}
+        )
+        self.assertEqual(award_challenge_badges(self.user.pk), 0)
+        
+        # bulk_create skips the gamification receivers that award points
+        Submission.objects.bulk_create([Submission(
             challenge=self.challenge,
             user=self.user,
+            code='def two_sum(nums, target): return [0, 1]',
+            language='python',
+            status='accepted'
+        )])
+        self.assertEqual(award_challenge_badges(self.user.pk), 1)
+        self.assertEqual(award_challenge_badges(self.user.pk), 0)
+        self.assertQuerySetEqual(
+            UserBadge.objects.filter(user=self.user).values_list('badge', flat=True),
+            [first.pk]
+        )
+        first.refresh_from_db()
+        self.assertEqual(first.earned_count, 1)
+    
+    def test_compute_rewards(self):
+        """Test time bonus and partial credit reward calculation."""
+        self.submission.status = 'accepted'
+        self.submission.execution_time = self.challenge.time_limit // 4
+        self.assertEqual(self.submission.compute_rewards(self.challenge), (120, 60))
+        
+        self.submission.status = 'wrong_answer'
+        self.submission.passed_test_cases = 5
+        self.submission.total_test_cases = 10
+        self.assertEqual(self.submission.compute_rewards(self.challenge), (15, 7))
+        
+        # Integer arithmetic keeps exact thirds from truncating down
+        self.submission.passed_test_cases = 2
+        self.submission.total_test_cases = 3
+        self.assertEqual(self.submission.compute_rewards(self.challenge), (20, 10))
+
+
+class ChallengeRatingModelTest(ChallengeFixtureMixin, TestCase):
+    """Test cases for ChallengeRating model."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = UserFactory(email='rater@example.com', first_name='Rater')
+        cls.rating = ChallengeRating.objects.create(
+            challenge=cls.challenge,
+            user=cls.user,
             rating=5,
             review='Great challenge!',
             difficulty_rating=4,
@@ -152,40 +452,64 @@ class ChallengeRatingModelTest(TestCase):
         """Test rating string representation."""
         expected = f'{self.user.email} rated {self.challenge.title}: 5/5'
         self.assertEqual(str(self.rating), expected)
+    
+    def test_rating_totals_track_changes(self):
+        """Test that cached rating totals follow create, update and delete."""
+        other = UserFactory(email='other@example.com')
+        ChallengeRating.objects.create(
+            challenge=self.challenge,
+            user=other,
+            rating=2,
+            difficulty_rating=3,
+            clarity_rating=3
+        )
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.rating_count, 2)
+        self.assertEqual(self.challenge.rating_sum, 7)
+        self.assertEqual(float(self.challenge.average_rating), 3.5)
+        
+        rating = ChallengeRating.objects.get(pk=self.rating.pk)
+        rating.rating = 3
+        rating.save()
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.rating_sum, 5)
+        self.assertEqual(float(self.challenge.average_rating), 2.5)
+        
+        ChallengeRating.objects.filter(user=other).delete()
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.rating_count, 1)
+        self.assertEqual(float(self.challenge.average_rating), 3.0)
+        
+        rating.delete()
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.rating_count, 0)
+        self.assertIsNone(self.challenge.average_rating)
+    
+    def test_refresh_rating_stats_in_one_update(self):
+        """Test that recounting rating totals is a single UPDATE statement."""
+        Challenge.objects.filter(pk=self.challenge.pk).update(
+            rating_sum=0, rating_count=0, average_rating=None
+        )
+        with CaptureQueriesContext(connection) as queries:
+            Challenge.refresh_rating_stats(self.challenge.pk)
+        self.assertEqual(len(queries), 1)
+        
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.rating_sum, 5)
+        self.assertEqual(self.challenge.rating_count, 1)
+        self.assertEqual(float(self.challenge.average_rating), 5.0)
 
 
-class ChallengeDiscussionModelTest(TestCase):
+class ChallengeDiscussionModelTest(ChallengeFixtureMixin, TestCase):
     """Test cases for ChallengeDiscussion model."""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
-            email='discusser@example.com',
-            password='pass123',
-            first_name='Discusser',
-            last_name='User'
-        )
-        self.creator = User.objects.create_user(
-            email='creator@example.com',
-            password='pass123',
-            first_name='Creator',
-            last_name='User'
-        )
-        self.category = Category.objects.create(
-            name='Algorithms',
-            description='Algorithm challenges'
-        )
-        self.challenge = Challenge.objects.create(
-            title='Two Sum Problem',
-            description='Find two numbers that add up to target',
-            problem_statement='Given an array of integers...',
-            difficulty_level='beginner',
-            category=self.category,
-            author=self.creator,
-            status='published'
-        )
-        self.discussion = ChallengeDiscussion.objects.create(
-            challenge=self.challenge,
-            user=self.user,
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = UserFactory(email='discusser@example.com', first_name='Discusser')
+        cls.discussion = ChallengeDiscussion.objects.create(
+            challenge=cls.challenge,
+            user=cls.user,
             content='How do I approach this problem?'
         )
     
@@ -201,53 +525,211 @@ class ChallengeDiscussionModelTest(TestCase):
         self.assertEqual(str(self.discussion), expected)
 
 
-class ChallengeAPITest(APITestCase):
+class ChallengeAPITest(ChallengeFixtureMixin, APITestCase):
     """Test cases for Challenge API endpoints."""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
-            email='test@example.com',
-            password='pass123',
-            first_name='Test',
-            last_name='User',
-            role='teacher'
-        )
-        self.creator = User.objects.create_user(
-            email='creator@example.com',
-            password='pass123',
-            first_name='Creator',
-            last_name='User'
-        )
-        self.category = Category.objects.create(
-            name='Algorithms',
-            description='Algorithm challenges'
-        )
-        self.challenge = Challenge.objects.create(
-            title='Two Sum Problem',
-            description='Find two numbers that add up to target',
-            problem_statement='Given an array of integers...',
-            difficulty_level='beginner',
-            category=self.category,
-            author=self.creator,
-            status='published'
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = UserFactory(email='test@example.com', role='teacher')
+        cls.list_url = reverse('challenges:challenge-list')
+        cls.detail_url = reverse(
+            'challenges:challenge-detail', kwargs={'pk': cls.challenge.pk}
         )
     
     def test_challenge_list_public_access(self):
         """Test that challenge list is publicly accessible."""
-        url = reverse('challenges:challenge-list')
+        url = self.list_url
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
     
     def test_challenge_detail_public_access(self):
         """Test that challenge detail is publicly accessible."""
-        url = reverse('challenges:challenge-detail', kwargs={'pk': self.challenge.pk})
+        url = self.detail_url
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['title'], 'Two Sum Problem')
     
+    def test_challenge_detail_cache_keeps_live_fields_fresh(self):
+        """Test that cached detail payloads still show current statistics."""
+        url = self.detail_url
+        self.client.get(url)
+        
+        Challenge.objects.filter(pk=self.challenge.pk).update(submission_count=7)
+        response = self.client.get(url)
+        self.assertEqual(response.data['submission_count'], 7)
+        self.assertEqual(response.data['title'], 'Two Sum Problem')
+        
+        self.challenge.title = 'Three Sum Problem'
+        self.challenge.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data['title'], 'Three Sum Problem')
+    
+    def test_challenge_detail_cache_shows_renamed_relations(self):
+        """Test that cached detail payloads show current category and tags."""
+        tag = Tag.objects.create(name='Arrays')
+        self.challenge.tags.add(tag)
+        url = self.detail_url
+        self.client.get(url)
+        
+        tag.name = 'Hashing'
+        tag.save()
+        self.category.name = 'Data Structures'
+        self.category.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data['category']['name'], 'Data Structures')
+        self.assertEqual(
+            [tag['name'] for tag in response.data['tags']], ['Hashing']
+        )
+    
+    def test_challenge_list_marks_favorites(self):
+        """Test that the list flags challenges the user has favorited."""
+        ChallengeFavorite.objects.create(user=self.user, challenge=self.challenge)
+        self.client.force_authenticate(user=self.user)
+        url = self.list_url
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        results = response.data.get('results', response.data)
+        self.assertTrue(results[0]['is_favorited'])
+    
+    def test_favorite_list_flags_nested_challenges(self):
+        """Test that favorited challenges carry user flags without per-row queries."""
+        ChallengeFavorite.objects.create(user=self.user, challenge=self.challenge)
+        SubmissionFactory(
+            challenge=self.challenge,
+            user=self.user,
+            status='accepted',
+            score=100
+        )
+        self.client.force_authenticate(user=self.user)
+        url = reverse('challenges:favorite-list')
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(url)
+        
+        other = ChallengeFactory(author=self.creator)
+        ChallengeFavorite.objects.create(user=self.user, challenge=other)
+        with CaptureQueriesContext(connection) as several:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(several), len(single))
+        
+        challenges = {
+            item['challenge']['id']: item['challenge']
+            for item in response.data.get('results', response.data)
+        }
+        self.assertTrue(challenges[self.challenge.pk]['is_favorited'])
+        self.assertTrue(challenges[self.challenge.pk]['is_solved'])
+        self.assertFalse(challenges[other.pk]['is_solved'])
+        self.assertIsNone(challenges[other.pk]['user_best_submission'])
+    
+    def test_challenge_list_user_state_without_per_row_queries(self):
+        """Test that solved flags and best submissions come from the queryset."""
+        for score, submission_status in ((40, 'wrong_answer'), (100, 'accepted')):
+            SubmissionFactory(
+                challenge=self.challenge,
+                user=self.user,
+                status=submission_status,
+                score=score
+            )
+        self.client.force_authenticate(user=self.user)
+        url = self.list_url
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(url)
+        
+        other = ChallengeFactory(author=self.creator)
+        with CaptureQueriesContext(connection) as several:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(several), len(single))
+        
+        results = {
+            item['id']: item for item in response.data.get('results', response.data)
+        }
+        self.assertTrue(results[self.challenge.pk]['is_solved'])
+        self.assertEqual(results[self.challenge.pk]['user_best_submission']['score'], 100)
+        self.assertFalse(results[other.pk]['is_solved'])
+        self.assertIsNone(results[other.pk]['user_best_submission'])
+    
+    def test_challenge_detail_user_submissions_skip_code(self):
+        """Test that detail view user submissions are read without the code column."""
+        SubmissionFactory(
+            challenge=self.challenge,
+            user=self.user,
+            status='accepted',
+            score=100
+        )
+        self.client.force_authenticate(user=self.user)
+        url = self.detail_url
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user_submissions'][0]['status'], 'accepted')
+        self.assertFalse(any(
+            'challenges_submission"."code"' in query['sql']
+            for query in queries.captured_queries
+        ))
+    
+    def test_challenge_list_query_count_does_not_grow_with_rows(self):
+        """Test that listing more challenges does not add per-row queries."""
+        url = self.list_url
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(url)
+        
+        for i in range(3):
+            challenge = ChallengeFactory()
+            challenge.tags.add(Tag.objects.create(name=f'Tag {i}', slug=f'tag-{i}'))
+        
+        with CaptureQueriesContext(connection) as several:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(several), len(single))
+        self.assertFalse(any(
+            'solution_code' in query['sql'] for query in several.captured_queries
+        ))
+    
+    def test_challenge_list_filters_by_tag(self):
+        """Test that challenges can be filtered by tag."""
+        tag = Tag.objects.create(name='Recycling', slug='recycling')
+        self.challenge.tags.add(tag)
+        ChallengeFactory(title='Untagged Problem', author=self.creator)
+        url = self.list_url
+        response = self.client.get(url, {'tags': tag.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        results = response.data.get('results', response.data)
+        self.assertEqual([c['id'] for c in results], [self.challenge.pk])
+    
+    def test_challenge_lookup_by_slug_ignores_case(self):
+        """Test that challenges can be fetched by slug in any case."""
+        url = reverse('challenges:challenge-by-slug', kwargs={'slug': 'Two-Sum-Problem'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], self.challenge.pk)
+    
+    def test_recommendations_follow_most_solved_difficulty(self):
+        """Test that recommendations target the user's most solved level."""
+        challenges = {
+            level: ChallengeFactory(difficulty_level=level, author=self.creator)
+            for level in ('intermediate', 'advanced', 'expert')
+        }
+        solved = ChallengeFactory.create_batch(
+            2, difficulty_level='intermediate', author=self.creator
+        )
+        for challenge in (*solved, solved[0], self.challenge):
+            SubmissionFactory(challenge=challenge, user=self.user, status='accepted')
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('challenges:challenge-recommendations'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(
+            [item['id'] for item in response.data],
+            [challenges['intermediate'].pk, challenges['advanced'].pk]
+        )
+    
     def test_challenge_creation_requires_authentication(self):
         """Test that challenge creation requires authentication."""
-        url = reverse('challenges:challenge-list')
+        url = self.list_url
         data = {
             'title': 'New Challenge',
             'description': 'New challenge description',
@@ -261,7 +743,7 @@ class ChallengeAPITest(APITestCase):
     def test_authenticated_user_can_create_challenge(self):
         """Test that authenticated user can create challenge."""
         self.client.force_authenticate(user=self.user)
-        url = reverse('challenges:challenge-list')
+        url = self.list_url
         data = {
             'title': 'New Challenge',
             'description': 'New challenge description',
@@ -272,41 +754,118 @@ class ChallengeAPITest(APITestCase):
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(Challenge.objects.filter(title='New Challenge').exists())
-
-
-class SubmissionAPITest(APITestCase):
-    """Test cases for Submission API endpoints."""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
-            email='test@example.com',
-            password='pass123',
-            first_name='Test',
-            last_name='User'
+    def test_challenge_test_cases_are_stored_as_rows(self):
+        """Test that submitted test cases become ordered child rows."""
+        self.client.force_authenticate(user=self.user)
+        url = self.list_url
+        data = {
+            'title': 'Test Case Challenge',
+            'description': 'Challenge with test cases',
+            'problem_statement': 'Solve this problem...',
+            'test_cases': [{'input': '1 2', 'expected_output': '3'}],
+            'hidden_test_cases': [{'input': '5 5', 'expected_output': '10'}]
+        }
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        challenge = Challenge.objects.get(title='Test Case Challenge')
+        self.assertEqual(
+            list(challenge.test_cases.values_list('ordinal', 'is_hidden', 'input')),
+            [(0, False, '1 2'), (1, True, '5 5')]
         )
-        self.creator = User.objects.create_user(
-            email='creator@example.com',
-            password='pass123',
-            first_name='Creator',
-            last_name='User'
+    
+    def test_challenge_test_case_values_are_stored_as_json(self):
+        """Test that non-string test case values are stored as JSON text."""
+        self.client.force_authenticate(user=self.user)
+        data = {
+            'title': 'JSON Test Case Challenge',
+            'description': 'Challenge with structured test cases',
+            'problem_statement': 'Solve this problem...',
+            'test_cases': [
+                {'input': {'nums': [2, 7], 'target': 9}, 'expected_output': [0, 1]},
+                {'input': 'plain text', 'expected_output': True}
+            ],
+            'hidden_test_cases': [{'input': None, 'expected_output': 3}]
+        }
+        response = self.client.post(self.list_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        challenge = Challenge.objects.get(title='JSON Test Case Challenge')
+        self.assertEqual(
+            list(challenge.test_cases.values_list('input', 'expected_output')),
+            [
+                ('{"nums": [2, 7], "target": 9}', '[0, 1]'),
+                ('plain text', 'true'),
+                ('null', '3')
+            ]
         )
-        self.category = Category.objects.create(
-            name='Algorithms',
-            description='Algorithm challenges'
+    
+    def test_challenge_test_case_update_keeps_results(self):
+        """Test that editing test cases keeps results for surviving rows."""
+        visible, hidden = ChallengeTestCase.objects.bulk_create([
+            ChallengeTestCase(
+                challenge=self.challenge, ordinal=0, input='1', expected_output='1'
+            ),
+            ChallengeTestCase(
+                challenge=self.challenge, ordinal=1, is_hidden=True,
+                input='2', expected_output='2'
+            ),
+        ])
+        SubmissionTestResult.objects.create(
+            submission=SubmissionFactory(challenge=self.challenge),
+            test_case=visible,
+            passed=True
         )
-        self.challenge = Challenge.objects.create(
-            title='Two Sum Problem',
-            description='Find two numbers that add up to target',
-            problem_statement='Given an array of integers...',
-            difficulty_level='beginner',
-            category=self.category,
-            author=self.creator,
-            status='published'
+        
+        serializer = ChallengeCreateSerializer(
+            self.challenge,
+            data={'hidden_test_cases': [{'input': '3', 'expected_output': '3'}]},
+            partial=True
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        
+        self.assertEqual(
+            list(self.challenge.test_cases.values_list('pk', 'input')),
+            [(visible.pk, '1'), (hidden.pk, '3')]
         )
+        self.assertEqual(SubmissionTestResult.objects.count(), 1)
+    
+    def test_challenge_tag_ids_are_validated_and_set(self):
+        """Test that tag IDs are checked before being linked by primary key."""
+        tag = Tag.objects.create(name='Recycling', slug='recycling')
+        self.client.force_authenticate(user=self.user)
+        url = self.list_url
+        data = {
+            'title': 'Tagged Challenge',
+            'description': 'Challenge with tags',
+            'problem_statement': 'Solve this problem...',
+            'tag_ids': [tag.pk, tag.pk + 1]
+        }
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tag_ids', response.data)
+        
+        data['tag_ids'] = [tag.pk]
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        challenge = Challenge.objects.get(title='Tagged Challenge')
+        self.assertEqual(list(challenge.tags.all()), [tag])
+
+
+class SubmissionAPITest(ChallengeFixtureMixin, APITestCase):
+    """Test cases for Submission API endpoints."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = UserFactory(email='test@example.com')
+        cls.list_url = reverse('challenges:submission-list')
     
     def test_submission_creation_requires_authentication(self):
         """Test that submission creation requires authentication."""
-        url = reverse('challenges:submission-list')
+        url = self.list_url
         data = {
             'challenge_id': self.challenge.pk,
             'code': 'def solution(): pass',
@@ -318,7 +877,7 @@ class SubmissionAPITest(APITestCase):
     def test_authenticated_user_can_submit(self):
         """Test that authenticated user can submit solution."""
         self.client.force_authenticate(user=self.user)
-        url = reverse('challenges:submission-list')
+        url = self.list_url
         data = {
             'challenge_id': self.challenge.pk,
             'code': 'def solution(): pass',
@@ -329,4 +888,98 @@ class SubmissionAPITest(APITestCase):
             print(f"Response status: {response.status_code}")
             print(f"Response data: {response.data}")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertTrue(Submission.objects.filter(user=self.user, challenge=self.challenge).exists())
\ No newline at end of file
+        self.assertTrue(Submission.objects.filter(user=self.user, challenge=self.challenge).exists())
+    
+    def test_submit_fetches_challenge_once(self):
+        """Test that creating a submission loads the challenge only once."""
+        self.client.force_authenticate(user=self.user)
+        url = self.list_url
+        data = {
+            'challenge_id': self.challenge.pk,
+            'code': 'def solution(): pass',
+            'language': 'python'
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        challenge_selects = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('SELECT')
+            and 'FROM "challenges_challenge"' in q['sql']
+        ]
+        self.assertEqual(len(challenge_selects), 1)
+    
+    def test_submission_list_counts_own_submissions(self):
+        """Test that the submission list count covers only the user's rows."""
+        for user in (self.user, self.user, self.creator):
+            SubmissionFactory(challenge=self.challenge, user=user)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+
+class ChallengeDiscussionAPITest(ChallengeFixtureMixin, APITestCase):
+    """Test cases for ChallengeDiscussion API endpoints."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = UserFactory(email='test@example.com')
+        cls.list_url = reverse('challenges:discussion-list')
+        cls.discussion = ChallengeDiscussion.objects.create(
+            challenge=cls.challenge,
+            user=cls.user,
+            content='How do I approach this problem?'
+        )
+        # Discussions have no receivers, so the replies go in one INSERT
+        ChallengeDiscussion.objects.bulk_create([
+            ChallengeDiscussion(
+                challenge=cls.challenge,
+                user=cls.user,
+                parent=cls.discussion,
+                content=content,
+                is_approved=approved
+            )
+            for content, approved in [('Use a hash map.', True), ('Spam', False)]
+        ])
+    
+    def test_discussion_list_includes_approved_replies(self):
+        """Test that only approved replies are listed under a discussion."""
+        self.client.force_authenticate(user=self.user)
+        url = self.list_url
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        results = response.data.get('results', response.data)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['reply_count'], 1)
+        self.assertEqual(
+            [reply['content'] for reply in results[0]['replies']],
+            ['Use a hash map.']
+        )
+        self.assertEqual(results[0]['replies'][0]['reply_count'], 0)
+    
+    def test_discussion_list_query_count_does_not_grow_with_rows(self):
+        """Test that listing more threads does not add per-row queries."""
+        self.client.force_authenticate(user=self.user)
+        url = self.list_url
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(url)
+        
+        for i in range(3):
+            author = UserFactory()
+            thread = ChallengeDiscussion.objects.create(
+                challenge=self.challenge,
+                user=author,
+                content=f'Question {i}'
+            )
+            ChallengeDiscussion.objects.create(
+                challenge=self.challenge,
+                user=self.user,
+                parent=thread,
+                content=f'Answer {i}'
+            )
+        
+        with CaptureQueriesContext(connection) as several:
+            self.client.get(url)
+        self.assertEqual(len(several), len(single))
@@ -1,5 +1,5 @@
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 from .views import (
     ChallengeViewSet, SubmissionViewSet, ChallengeRatingViewSet,
     ChallengeFavoriteViewSet, ChallengeDiscussionViewSet
@@ -8,7 +8,7 @@ from .views import (
 app_name = 'challenges'
 
 # Create router and register viewsets
-router = DefaultRouter()
+router = SimpleRouter()
 router.register(r'challenges', ChallengeViewSet, basename='challenge')
 router.register(r'submissions', SubmissionViewSet, basename='submission')
 router.register(r'ratings', ChallengeRatingViewSet, basename='rating')
@@ -1,7 +1,7 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Avg, Count, F, Max
+from django.db.models import Q, Avg, Count, F, Max, Prefetch
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
@@ -11,6 +11,8 @@ from .models import (
     Challenge, Submission, ChallengeRating,
     ChallengeFavorite, ChallengeDiscussion
 )
+from .pagination import EstimatedCountPagination
+from .tasks import queue_evaluation
 from .serializers import (
     ChallengeListSerializer, ChallengeDetailSerializer, ChallengeCreateSerializer,
     SubmissionSerializer, SubmissionCreateSerializer, SubmissionDetailSerializer,
@@ -29,12 +31,17 @@ class ChallengeViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = [
         'difficulty_level', 'challenge_type', 'category',
-        'is_featured', 'author'
+        'is_featured', 'author', 'tags'
     ]
     search_fields = ['title', 'description', 'problem_statement']
-    ordering_fields = ['title', 'created_at', 'published_at', 'difficulty_level']
+    ordering_fields = [
+        'title', 'created_at', 'published_at', 'difficulty_level', 'success_rate'
+    ]
     ordering = ['-created_at']
     
+    # Actions rendered with ChallengeListSerializer
+    list_actions = ['list', 'featured', 'recommendations']
+    
     def get_queryset(self):
         """Return challenges based on user permissions."""
         user = self.request.user
@@ -45,16 +52,18 @@ class ChallengeViewSet(viewsets.ModelViewSet):
             user.role == User.UserRole.TEACHER
         ):
             # Teachers and admins can see all challenges
-            return Challenge.objects.all().select_related(
-                'category', 'author'
-            ).prefetch_related('tags')
+            queryset = Challenge.objects.with_list_relations()
         else:
             # Students and anonymous users see only published challenges
-            return Challenge.objects.filter(
-                status=Challenge.Status.PUBLISHED
-            ).select_related(
-                'category', 'author'
-            ).prefetch_related('tags')
+            queryset = Challenge.objects.published().with_list_relations()
+        
+        if self.action in self.list_actions:
+            queryset = queryset.defer_content()
+        if user.is_authenticated:
+            queryset = queryset.with_favorite_flag(user).with_solved_flag(user)
+            if self.action in self.list_actions:
+                queryset = queryset.with_best_submission(user)
+        return queryset
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -74,6 +83,22 @@ class ChallengeViewSet(viewsets.ModelViewSet):
         
         return [permission() for permission in permission_classes]
     
+    @action(detail=False, methods=['get'], url_path=r'slug/(?P<slug>[-\w]+)')
+    def by_slug(self, request, slug=None):
+        """Get a challenge by its slug, ignoring case."""
+        challenge = self.get_queryset().with_slug(slug).first()
+        if challenge is None:
+            return Response(
+                {'error': 'Challenge not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        serializer = ChallengeDetailSerializer(
+            challenge,
+            context={'request': request}
+        )
+        return Response(serializer.data)
+    
     @action(detail=True, methods=['post'])
     def submit(self, request, pk=None):
         """Submit solution to a challenge."""
@@ -96,9 +121,7 @@ class ChallengeViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             submission = serializer.save()
-            
-            # TODO: Queue submission for evaluation
-            # This would typically involve sending to a code execution service
+            queue_evaluation([submission.pk])
             
             return Response({
                 'message': 'Submission received successfully!',
@@ -331,14 +354,15 @@ class ChallengeViewSet(viewsets.ModelViewSet):
         
         user = request.user
         
-        # Get user's solved challenges to determine skill level
-        solved_challenges = Challenge.objects.filter(
+        # Determine user's current level from their most solved difficulty
+        most_common_difficulty = Challenge.objects.filter(
             submissions__user=user,
             submissions__status=Submission.Status.ACCEPTED
-        ).distinct()
+        ).values('difficulty_level').annotate(
+            solved=Count('id', distinct=True)
+        ).order_by('-solved').values_list('difficulty_level', flat=True).first()
         
-        # Determine user's current level
-        if solved_challenges.count() == 0:
+        if most_common_difficulty is None:
             # New user - recommend beginner challenges
             recommended = self.get_queryset().filter(
                 difficulty_level=Challenge.DifficultyLevel.BEGINNER,
@@ -347,14 +371,6 @@ class ChallengeViewSet(viewsets.ModelViewSet):
                 submissions__user=user
             )[:10]
         else:
-            # Get user's most common difficulty level
-            difficulty_counts = {}
-            for challenge in solved_challenges:
-                difficulty = challenge.difficulty_level
-                difficulty_counts[difficulty] = difficulty_counts.get(difficulty, 0) + 1
-            
-            most_common_difficulty = max(difficulty_counts, key=difficulty_counts.get)
-            
             # Recommend challenges of similar or slightly higher difficulty
             difficulty_order = [
                 Challenge.DifficultyLevel.BEGINNER,
@@ -394,25 +410,42 @@ class SubmissionViewSet(viewsets.ModelViewSet):
     filterset_fields = ['challenge', 'language', 'status']
     ordering_fields = ['submitted_at', 'score', 'execution_time']
     ordering = ['-submitted_at']
+    pagination_class = EstimatedCountPagination
     
     def get_queryset(self):
         """Return submissions based on user permissions."""
         user = self.request.user
         
         if user.is_superuser or user.role == User.UserRole.ADMIN:
-            return Submission.objects.all().select_related(
+            queryset = Submission.objects.all().select_related(
                 'challenge', 'user'
             )
         elif user.role == User.UserRole.TEACHER:
             # Teachers can see submissions to their challenges
-            return Submission.objects.filter(
+            queryset = Submission.objects.filter(
                 Q(user=user) | Q(challenge__author=user)
             ).select_related('challenge', 'user')
         else:
             # Students can only see their own submissions
-            return Submission.objects.filter(
+            queryset = Submission.objects.filter(
                 user=user
             ).select_related('challenge', 'user')
+        
+        if self.action == 'retrieve':
+            # Prefetch rather than join the challenge so it carries the
+            # user-specific flags rendered by ChallengeListSerializer
+            challenges = (
+                Challenge.objects.with_list_relations()
+                .with_favorite_flag(user)
+                .with_solved_flag(user)
+            )
+            queryset = queryset.select_related(None).select_related(
+                'user'
+            ).prefetch_related(
+                Prefetch('challenge', queryset=challenges),
+                'test_results'
+            )
+        return queryset
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -426,9 +459,7 @@ class SubmissionViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Create submission and queue for evaluation."""
         submission = serializer.save()
-        
-        # TODO: Queue submission for evaluation
-        # This would typically involve sending to a code execution service
+        queue_evaluation([submission.pk])
         
         return submission
     
@@ -449,9 +480,9 @@ class SubmissionViewSet(viewsets.ModelViewSet):
         # Reset submission status
         submission.status = Submission.Status.PENDING
         submission.evaluated_at = None
+        submission.finalize(submission.challenge)
         submission.save()
-        
-        # TODO: Queue submission for evaluation
+        queue_evaluation([submission.pk])
         
         return Response({
             'message': 'Submission queued for re-evaluation.',
@@ -492,9 +523,17 @@ class ChallengeFavoriteViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return user's favorite challenges."""
-        return ChallengeFavorite.objects.filter(
-            user=self.request.user
-        ).select_related('challenge')
+        user = self.request.user
+        challenges = (
+            Challenge.objects.with_list_relations()
+            .defer_content()
+            .with_favorite_flag(user)
+            .with_solved_flag(user)
+            .with_best_submission(user)
+        )
+        return ChallengeFavorite.objects.filter(user=user).prefetch_related(
+            Prefetch('challenge', queryset=challenges)
+        )
     
     def perform_create(self, serializer):
         """Create favorite with current user."""
@@ -512,11 +551,21 @@ class ChallengeDiscussionViewSet(viewsets.ModelViewSet):
     ordering = ['created_at']
     
     def get_queryset(self):
-        """Return approved discussions."""
+        """Return approved discussions with their approved replies."""
+        approved = ChallengeDiscussion.objects.filter(
+            is_approved=True
+        ).select_related('user__profile').order_by('created_at')
+        
+        # Replies carry their own approved_replies so reply_count is free
+        replies = approved.prefetch_related(
+            Prefetch('replies', queryset=approved, to_attr='approved_replies')
+        )
         return ChallengeDiscussion.objects.filter(
             is_approved=True,
             parent=None  # Only top-level discussions
-        ).select_related('user', 'challenge')
+        ).select_related('user__profile', 'challenge').prefetch_related(
+            Prefetch('replies', queryset=replies, to_attr='approved_replies')
+        )
     
     def perform_create(self, serializer):
         """Create discussion with current user."""
@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from apps.content.models import Category, Lesson, Quiz, Question, Answer
 from apps.challenges.models import Challenge
 from django.utils.text import slugify
+from django.utils import timezone
 import uuid
 
 User = get_user_model()
@@ -1330,30 +1331,44 @@ Your business plan must:
             }
         ]
         
-        for challenge_data in challenges_data:
-            category = categories[challenge_data['category']]
-            
-            challenge, created = Challenge.objects.get_or_create(
+        # One lookup for existing titles and one INSERT for the rest.
+        existing_titles = set(
+            Challenge.objects.filter(
+                title__in=[c['title'] for c in challenges_data]
+            ).values_list('title', flat=True)
+        )
+        published_at = timezone.now()
+        
+        to_create = [
+            Challenge(
                 title=challenge_data['title'],
-                defaults={
-                    'slug': slugify(challenge_data['title']),
-                    'description': challenge_data['description'],
-                    'problem_statement': challenge_data['problem_statement'],
-                    'input_format': challenge_data['input_format'],
-                    'output_format': challenge_data['output_format'],
-                    'constraints': challenge_data['constraints'],
-                    'examples': challenge_data['examples'],
-                    'hints': challenge_data['hints'],
-                    'category': category,
-                    'author': admin_user,
-                    'difficulty_level': challenge_data['difficulty'],
-                    'challenge_type': challenge_data['challenge_type'],
-                    'points_reward': challenge_data['points_reward'],
-                    'xp_reward': challenge_data['xp_reward'],
-                    'status': 'published',
-                    'is_featured': True
-                }
+                # bulk_create bypasses Challenge.save(), so set slug and
+                # published_at explicitly.
+                slug=slugify(challenge_data['title']),
+                description=challenge_data['description'],
+                problem_statement=challenge_data['problem_statement'],
+                input_format=challenge_data['input_format'],
+                output_format=challenge_data['output_format'],
+                constraints=challenge_data['constraints'],
+                examples=challenge_data['examples'],
+                hints=challenge_data['hints'],
+                category=categories[challenge_data['category']],
+                author=admin_user,
+                difficulty_level=challenge_data['difficulty'],
+                challenge_type=challenge_data['challenge_type'],
+                points_reward=challenge_data['points_reward'],
+                xp_reward=challenge_data['xp_reward'],
+                status='published',
+                published_at=published_at,
+                is_featured=True
             )
-            
-            if created:
-                self.stdout.write(f'Created challenge: {challenge_data["title"]}')
\ No newline at end of file
+            for challenge_data in challenges_data
+            if challenge_data['title'] not in existing_titles
+        ]
+        
+        Challenge.objects.bulk_create(
+            to_create, batch_size=500, ignore_conflicts=True
+        )
+        
+        for challenge in to_create:
+            self.stdout.write(f'Created challenge: {challenge.title}')
@@ -8,6 +8,25 @@ import uuid
 User = get_user_model()
 
 
+class CategoryQuerySet(models.QuerySet):
+    """QuerySet helpers for content categories."""
+    
+    def with_published_counts(self):
+        """Annotate the number of published lessons and quizzes."""
+        return self.annotate(
+            published_lesson_count=models.Count(
+                'lessons',
+                filter=models.Q(lessons__is_published=True),
+                distinct=True
+            ),
+            published_quiz_count=models.Count(
+                'quizzes',
+                filter=models.Q(quizzes__is_published=True),
+                distinct=True
+            )
+        )
+
+
 class Category(models.Model):
     """Content categories for organizing lessons and quizzes."""
     
@@ -20,6 +39,8 @@ class Category(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CategoryQuerySet.as_manager()
+    
     class Meta:
         verbose_name_plural = "Categories"
         ordering = ['name']
@@ -24,9 +24,13 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['slug', 'created_at']
     
     def get_lesson_count(self, obj):
+        if hasattr(obj, 'published_lesson_count'):
+            return obj.published_lesson_count
         return obj.lessons.filter(is_published=True).count()
     
     def get_quiz_count(self, obj):
+        if hasattr(obj, 'published_quiz_count'):
+            return obj.published_quiz_count
         return obj.quizzes.filter(is_published=True).count()
 
 
@@ -26,7 +26,7 @@ User = get_user_model()
 class CategoryViewSet(viewsets.ModelViewSet):
     """ViewSet for content categories."""
     
-    queryset = Category.objects.filter(is_active=True)
+    queryset = Category.objects.filter(is_active=True).with_published_counts()
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [SearchFilter, OrderingFilter]
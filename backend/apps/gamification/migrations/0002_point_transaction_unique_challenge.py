@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:12
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def delete_duplicate_challenge_points(apps, schema_editor):
+    PointTransaction = apps.get_model('gamification', 'PointTransaction')
+    
+    # Racing saves could award a challenge twice; keep the earliest award
+    solved = PointTransaction.objects.filter(transaction_type='challenge_solved')
+    first_award = solved.filter(
+        user_id=OuterRef('user_id'),
+        reference_id=OuterRef('reference_id')
+    ).order_by('created_at', 'pk').values('pk')[:1]
+    solved.exclude(pk=Subquery(first_award)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicate_challenge_points, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='pointtransaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('transaction_type', 'challenge_solved')), fields=('user', 'reference_id'), name='unique_challenge_solved_points'),
+        ),
+    ]
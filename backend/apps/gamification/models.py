@@ -217,6 +217,13 @@ class PointTransaction(models.Model):
             models.Index(fields=['reference_id']),
             models.Index(fields=['created_at']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'reference_id'],
+                condition=models.Q(transaction_type='challenge_solved'),
+                name='unique_challenge_solved_points',
+            ),
+        ]
     
     def __str__(self):
         sign = '+' if self.points >= 0 else ''
@@ -1,14 +1,19 @@
+from django.db import IntegrityError, transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.cache import cache
+from apps.challenges.signals import _is_status_untouched
 from .models import (
     PointTransaction, Badge, UserBadge, Achievement, Leaderboard
 )
 
 User = get_user_model()
 
+POINT_MILESTONES = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+STREAK_MILESTONES = (3, 7, 14, 30, 60, 100, 365)
+
 
 @receiver(post_save, sender='content.LessonCompletion')
 def award_lesson_completion_points(sender, instance, created, **kwargs):
@@ -139,53 +144,62 @@ def award_quiz_completion_points(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender='challenges.Submission')
-def award_challenge_points(sender, instance, created, **kwargs):
+def award_challenge_points(sender, instance, created, update_fields=None, **kwargs):
     """Award points when a challenge is solved."""
+    if _is_status_untouched(created, update_fields):
+        return
+    
     if instance.status == 'accepted':
-        # Check if we already awarded points for this challenge
-        existing_transaction = PointTransaction.objects.filter(
-            user=instance.user,
-            transaction_type=PointTransaction.TransactionType.CHALLENGE_SOLVED,
-            reference_id=str(instance.challenge.id)
-        ).exists()
+        solved = {
+            'user_id': instance.user_id,
+            'transaction_type': PointTransaction.TransactionType.CHALLENGE_SOLVED,
+            'reference_id': str(instance.challenge_id),
+        }
+        # Already rewarded: stop before loading the challenge
+        if PointTransaction.objects.filter(**solved).exists():
+            return
         
-        if not existing_transaction:
-            # Points based on challenge difficulty
-            difficulty_points = {
-                'beginner': 20,
-                'intermediate': 35,
-                'advanced': 50,
-                'expert': 75
-            }
-            
-            challenge_difficulty = instance.challenge.difficulty_level
-            base_points = difficulty_points.get(challenge_difficulty, 20)
-            
-            # Bonus for optimal solution (based on execution time and memory)
-            performance_bonus = 0
-            if hasattr(instance, 'execution_time') and instance.execution_time:
-                # Award bonus for fast solutions (implementation depends on challenge)
-                if instance.execution_time < 1000:  # Less than 1 second
-                    performance_bonus += 5
-            
-            total_points = base_points + performance_bonus
-            
-            # Create point transaction
-            PointTransaction.objects.create(
-                user=instance.user,
-                points=total_points,
-                transaction_type=PointTransaction.TransactionType.CHALLENGE_SOLVED,
-                description=f"Solved challenge: {instance.challenge.title}",
-                reference_id=str(instance.challenge.id),
-                metadata={
-                    'challenge_title': instance.challenge.title,
-                    'difficulty': challenge_difficulty,
-                    'base_points': base_points,
-                    'performance_bonus': performance_bonus,
-                    'execution_time': getattr(instance, 'execution_time', None)
-                }
-            )
-            
+        # Points based on challenge difficulty
+        difficulty_points = {
+            'beginner': 20,
+            'intermediate': 35,
+            'advanced': 50,
+            'expert': 75
+        }
+        
+        challenge_difficulty = instance.challenge.difficulty_level
+        base_points = difficulty_points.get(challenge_difficulty, 20)
+        
+        # Bonus for optimal solution (based on execution time and memory)
+        performance_bonus = 0
+        if hasattr(instance, 'execution_time') and instance.execution_time:
+            # Award bonus for fast solutions (implementation depends on challenge)
+            if instance.execution_time < 1000:  # Less than 1 second
+                performance_bonus += 5
+        
+        total_points = base_points + performance_bonus
+        
+        # Award points only once per challenge (unique_challenge_solved_points)
+        try:
+            with transaction.atomic():
+                PointTransaction.objects.create(
+                    **solved,
+                    points=total_points,
+                    description=f"Solved challenge: {instance.challenge.title}",
+                    metadata={
+                        'challenge_title': instance.challenge.title,
+                        'difficulty': challenge_difficulty,
+                        'base_points': base_points,
+                        'performance_bonus': performance_bonus,
+                        'execution_time': getattr(instance, 'execution_time', None)
+                    }
+                )
+            created_transaction = True
+        except IntegrityError:
+            # A concurrent save awarded the points first
+            created_transaction = False
+        
+        if created_transaction:
             # Check for first challenge achievement
             if not Achievement.objects.filter(
                 user=instance.user,
@@ -229,10 +243,7 @@ def check_point_milestones(sender, instance, created, **kwargs):
         user = instance.user
         total_points = user.profile.total_points
         
-        # Define point milestones
-        milestones = [100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000]
-        
-        for milestone in milestones:
+        for milestone in POINT_MILESTONES:
             if total_points >= milestone:
                 # Check if user already has this milestone
                 if not Achievement.objects.filter(
@@ -258,10 +269,7 @@ def check_streak_milestones(sender, instance, created, **kwargs):
         user = instance.user
         streak = instance.streak_days
         
-        # Define streak milestones
-        milestones = [3, 7, 14, 30, 60, 100, 365]
-        
-        for milestone in milestones:
+        for milestone in STREAK_MILESTONES:
             if streak >= milestone:
                 # Check if user already has this milestone
                 if not Achievement.objects.filter(
@@ -292,10 +300,10 @@ def update_leaderboard_cache(sender, instance, created, **kwargs):
         
         # In a real implementation, you'd use cache.delete_pattern
         # For now, we'll clear specific known caches
-        leaderboards = Leaderboard.objects.filter(is_active=True)
-        for leaderboard in leaderboards:
-            cache_key = f'leaderboard:{leaderboard.id}'
-            cache.delete(cache_key)
+        leaderboard_ids = Leaderboard.objects.filter(
+            is_active=True
+        ).values_list('id', flat=True)
+        cache.delete_many([f'leaderboard:{pk}' for pk in leaderboard_ids])
 
 
 @receiver(post_save, sender=UserBadge)
@@ -1,9 +1,14 @@
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
+from apps.challenges.factories import SubmissionFactory
+from apps.challenges.models import Submission
 from .models import Badge, PointTransaction, UserBadge, Leaderboard, Achievement
+from .signals import award_challenge_points
 
 User = get_user_model()
 
@@ -63,7 +68,43 @@ class PointTransactionModelTest(TestCase):
         """Test transaction string representation."""
         expected = f'{self.user.email}: +50 pts - Completed lesson: Python Basics'
         self.assertEqual(str(self.transaction), expected)
+    
+    def test_challenge_points_unique_per_challenge(self):
+        """Test that a challenge's solve points can only be recorded once."""
+        PointTransaction.objects.create(
+            user=self.user,
+            points=20,
+            transaction_type='challenge_solved',
+            description='Solved challenge: Two Sum',
+            reference_id='1'
+        )
+        with self.assertRaises(IntegrityError):
+            PointTransaction.objects.create(
+                user=self.user,
+                points=20,
+                transaction_type='challenge_solved',
+                description='Solved challenge: Two Sum',
+                reference_id='1'
+            )
 
+    
+    def test_challenge_points_awarded_once_without_reloading(self):
+        """Test that re-saving a solved submission skips the challenge load."""
+        submission = SubmissionFactory(user=self.user)
+        submission.status = Submission.Status.ACCEPTED
+        submission.save()
+        submission.save()
+        self.assertEqual(
+            PointTransaction.objects.filter(transaction_type='challenge_solved').count(),
+            1
+        )
+        
+        submission = Submission.objects.get(pk=submission.pk)
+        with CaptureQueriesContext(connection) as queries:
+            award_challenge_points(
+                sender=Submission, instance=submission, created=False
+            )
+        self.assertEqual(len(queries), 1)
 
 class UserBadgeModelTest(TestCase):
     """Test cases for UserBadge model."""
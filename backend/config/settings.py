@@ -95,6 +95,10 @@ DATABASES = {
     'default': dj_database_url.parse(DATABASE_URL)
 }
 
+# Covering indexes (Index.include) are PostgreSQL-only; on SQLite the
+# extra columns are simply left out of the index.
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -209,6 +213,15 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'recompute-challenge-statistics': {
+        'task': 'apps.challenges.tasks.recompute_challenge_statistics',
+        'schedule': config('CHALLENGE_STATS_RECOMPUTE_SECONDS', default=600, cast=int),
+    },
+}
+
+# Dotted path to the callable that runs a submission against its test cases
+SUBMISSION_EVALUATOR = config('SUBMISSION_EVALUATOR', default='')
 
 # Logging Configuration
 LOGGING = {
@@ -0,0 +1,5 @@
+"""Settings for running the test suite; never use these to serve traffic."""
+from .settings import *  # noqa: F401,F403
+
+# PBKDF2 dominates fixture setup; MD5 is insecure but fine for test users
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']